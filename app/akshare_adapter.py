@@ -3,12 +3,248 @@
 akshare数据适配器 - 将akshare数据转换为Kronos格式
 """
 
+import os
+import json
+import time
+import threading
+import functools
 import pandas as pd
 import numpy as np
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Tuple, Optional
 
+try:
+    import polars as pl
+    HAS_POLARS = True
+except ImportError:
+    HAS_POLARS = False
+
+try:
+    import pyarrow  # noqa: F401  (pandas 的 Parquet 引擎)
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# 设置 KRONOS_FAST_IO=1 且已安装 polars 时，使用 polars 多线程解析CSV
+FAST_IO = os.getenv('KRONOS_FAST_IO', '0') == '1' and HAS_POLARS
+
+# Kronos输入列顺序
+KRONOS_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'amount']
+
+# period参数对应的回溯天数
+PERIOD_DAYS = {
+    "6mo": 6 * 30,      # 6个月
+    "1y": 365,          # 1年
+    "2y": 2 * 365,      # 2年
+    "5y": 5 * 365       # 5年
+}
+
+
+# 列名映射：akshare中文列名 -> Kronos格式
+COLUMN_MAPPING = {
+    '日期': 'date',
+    '开盘': 'open',
+    '收盘': 'close',
+    '最高': 'high',
+    '最低': 'low',
+    '成交量': 'volume',
+    '成交额': 'amount'
+}
+
+# 读取CSV时直接指定的列类型（中英文列名均兼容）
+_NUMERIC_DTYPES = {
+    'open': 'float32',
+    'high': 'float32',
+    'low': 'float32',
+    'close': 'float32',
+    'volume': 'float64',
+    'amount': 'float64'
+}
+_CSV_DTYPES = {
+    **_NUMERIC_DTYPES,
+    **{cn: _NUMERIC_DTYPES[en] for cn, en in COLUMN_MAPPING.items() if en in _NUMERIC_DTYPES}
+}
+
+
+@functools.lru_cache(maxsize=128)
+def _load_full_df(csv_file: str, mtime: float) -> pd.DataFrame:
+    """
+    读取并清洗完整的股票CSV（带缓存）
+
+    以 (文件路径, 修改时间) 为缓存键，文件更新后 mtime 变化即自动失效。
+    返回的 DataFrame 被多次请求共享，调用方不得原地修改。
+    """
+    # 先读表头确定实际列名，再按固定schema一次性完成类型解析
+    header = pd.read_csv(csv_file, nrows=0).columns
+    date_col = '日期' if '日期' in header else 'date'
+    df = pd.read_csv(
+        csv_file,
+        usecols=[col for col in header if col == date_col or col in _CSV_DTYPES],
+        dtype={col: dtype for col, dtype in _CSV_DTYPES.items() if col in header},
+        parse_dates=[date_col],
+        cache_dates=True,
+        engine='c'
+    )
+
+    # 重命名列以匹配Kronos格式
+    df = df.rename(columns=COLUMN_MAPPING)
+
+    # 按日期排序
+    df = df.sort_values('date')
+
+    # 移除缺失值
+    return df.dropna()
+
+
+@functools.lru_cache(maxsize=128)
+def _load_parquet_df(parquet_file: str, mtime: float) -> pd.DataFrame:
+    """读取已清洗的 Parquet 旁路文件（带缓存），只读取所需列，无需类型转换"""
+    return pd.read_parquet(parquet_file, columns=['date'] + KRONOS_COLUMNS)
+
+
+def _load_stock_df(csv_file: Path) -> pd.DataFrame:
+    """
+    加载股票的完整清洗数据
+
+    优先读取同名 .parquet 旁路文件；不存在或早于CSV时解析CSV并生成（zstd压缩）。
+    未安装 pyarrow 时直接解析CSV。返回的 DataFrame 为共享缓存，调用方不得原地修改。
+    """
+    csv_mtime = csv_file.stat().st_mtime
+    if not HAS_PYARROW:
+        return _load_full_df(str(csv_file), csv_mtime)
+
+    parquet_file = csv_file.with_suffix('.parquet')
+    if parquet_file.exists():
+        parquet_mtime = parquet_file.stat().st_mtime
+        if parquet_mtime >= csv_mtime:
+            return _load_parquet_df(str(parquet_file), parquet_mtime)
+
+    df = _load_full_df(str(csv_file), csv_mtime)
+    try:
+        tmp_file = csv_file.with_name(f"{csv_file.stem}.parquet.tmp")
+        df[['date'] + KRONOS_COLUMNS].to_parquet(tmp_file, compression='zstd', index=False)
+        os.replace(tmp_file, parquet_file)
+    except Exception as e:
+        print(f"⚠️ 生成 {csv_file.stem} Parquet 缓存失败: {str(e)}")
+    return df
+
+
+# 股票名称映射文件（位于数据目录下，{代码: 名称}），不存在时使用内置的简化映射
+STOCK_NAMES_FILE = "stock_names.json"
+
+_DEFAULT_STOCK_NAMES = {
+    "000001": "平安银行",
+    "000002": "万科A",
+    "000004": "*ST国华",
+    "000005": "世纪星源",
+    "000006": "深振业A",
+    "000007": "全新好",
+    "000008": "神州高铁",
+    "000009": "中国宝安",
+    "000010": "美丽生态"
+}
+
+# 代码前缀 -> 交易所，未列出的前缀归为上海
+_MARKET_BY_PREFIX = {"00": "深圳"}
+
+# 股票名称映射文件最多每隔这么多秒检查一次是否更新，期间直接复用已加载的映射
+_NAMES_RECHECK_SECONDS = 30
+
+# 张量缓存最多每隔这么多秒检查一次数据文件是否更新，有变化时重建
+_TENSOR_RECHECK_SECONDS = 30
+
+
+@functools.lru_cache(maxsize=4)
+def _load_stock_names(names_file: str, mtime: Optional[float]) -> dict:
+    """加载股票名称映射（带缓存，映射文件更新后按 mtime 自动失效）"""
+    if mtime is None:
+        return _DEFAULT_STOCK_NAMES
+
+    try:
+        with open(names_file, 'r', encoding='utf-8') as f:
+            return {**_DEFAULT_STOCK_NAMES, **json.load(f)}
+    except Exception as e:
+        print(f"⚠️ 读取股票名称映射失败: {str(e)}")
+        return _DEFAULT_STOCK_NAMES
+
+
+def _read_arrays_polars(csv_file: Path) -> Tuple[np.ndarray, np.ndarray]:
+    """使用 polars 解析CSV，直接返回 (日期数组, 数值数组)，清洗规则与 _load_full_df 一致"""
+    header = pl.read_csv(csv_file, n_rows=0).columns
+    date_col = '日期' if '日期' in header else 'date'
+    numeric_cols = [col for col in header if col in _CSV_DTYPES]
+    df = pl.read_csv(
+        csv_file,
+        columns=[date_col] + numeric_cols,
+        schema_overrides={date_col: pl.Utf8, **{col: pl.Float64 for col in numeric_cols}}
+    )
+
+    df = (
+        df.rename({col: COLUMN_MAPPING[col] for col in df.columns if col in COLUMN_MAPPING})
+        .with_columns(pl.col('date').str.slice(0, 10).str.to_date('%Y-%m-%d', strict=False))
+        .drop_nulls()
+        .sort('date')
+    )
+
+    values = df.select(KRONOS_COLUMNS).to_numpy().astype(np.float32)
+    dates = df['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    return dates, values
+
+
+@functools.lru_cache(maxsize=8)
+def _list_stock_codes(data_dir: str, mtime: float) -> Tuple[str, ...]:
+    """扫描数据目录下的CSV文件名（带缓存，目录内文件增删后 mtime 变化即自动失效）"""
+    with os.scandir(data_dir) as it:
+        return tuple(sorted(
+            entry.name[:-4] for entry in it
+            if entry.name.endswith('.csv') and entry.is_file()
+        ))
+
+
+def _sidecar_paths(csv_file: Path) -> Tuple[Path, Path]:
+    """CSV对应的 .npy 旁路文件: (数值数组, 日期数组)"""
+    return csv_file.with_suffix('.npy'), csv_file.with_name(f"{csv_file.stem}_dates.npy")
+
+
+def _sidecar_fresh(csv_file: Path) -> bool:
+    """旁路文件是否存在且不早于CSV"""
+    values_file, dates_file = _sidecar_paths(csv_file)
+    return (values_file.exists() and dates_file.exists()
+            and values_file.stat().st_mtime >= csv_file.stat().st_mtime)
+
+
+def _build_sidecar(csv_file: Path) -> bool:
+    """
+    将CSV一次性转换为 .npy 旁路文件
+
+    数值保存为 (N, 6) float32 数组，日期保存为 int64 纪元日数组；
+    旁路文件不早于CSV时直接复用，CSV更新后自动重建。
+    """
+    values_file, dates_file = _sidecar_paths(csv_file)
+    try:
+        if _sidecar_fresh(csv_file):
+            return True
+
+        if FAST_IO:
+            dates, values = _read_arrays_polars(csv_file)
+        else:
+            df = _load_stock_df(csv_file)
+            values = df[KRONOS_COLUMNS].to_numpy(dtype=np.float32)
+            dates = df['date'].to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+        # 先写临时文件再原子替换，避免并发读取到半写入的文件；数值文件最后写入作为完成标记
+        for path, arr in ((dates_file, dates), (values_file, values)):
+            tmp_file = path.with_suffix('.tmp')
+            with open(tmp_file, 'wb') as f:
+                np.save(f, arr)
+            os.replace(tmp_file, path)
+        return True
+    except Exception as e:
+        print(f"❌ 生成 {csv_file.stem} 缓存失败: {str(e)}")
+        return False
+
+
 class AkshareDataAdapter:
     """akshare数据适配器"""
     
@@ -25,6 +261,19 @@ class AkshareDataAdapter:
                 self.data_dir = Path("volumes/data/akshare_data")
         else:
             self.data_dir = Path(data_dir)
+
+        # 全量张量缓存（由 build_tensor_cache 构建）：(代码->行号, 数值张量, 日期张量, 各股票长度)
+        # 整体作为一个元组替换，重建期间并发请求读到的始终是一致的一组
+        self._tensor_state = None
+        self._tensor_signature = None
+        self._tensor_max_len = None
+        self._tensor_checked_at = 0.0
+        self._tensor_lock = threading.Lock()
+
+        # 股票名称映射（get_stock_info 按 _NAMES_RECHECK_SECONDS 间隔检查文件更新）
+        self._names_file = self.data_dir / STOCK_NAMES_FILE
+        self._stock_names = None
+        self._names_checked_at = 0.0
         
     def get_stock_data(self, stock_code: str, lookback: int = 100, period: str = "1y") -> Optional[pd.DataFrame]:
         """
@@ -47,65 +296,32 @@ class AkshareDataAdapter:
             return None
         
         try:
-            # 读取数据
-            df = pd.read_csv(csv_file)
-            
-            # 重命名列以匹配Kronos格式
-            column_mapping = {
-                '日期': 'date',
-                '开盘': 'open',
-                '收盘': 'close', 
-                '最高': 'high',
-                '最低': 'low',
-                '成交量': 'volume',
-                '成交额': 'amount'
-            }
-            
-            df = df.rename(columns=column_mapping)
-            
-            # 确保数据类型正确
-            df['date'] = pd.to_datetime(df['date'])
-            for col in ['open', 'high', 'low', 'close', 'volume', 'amount']:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            # 按日期排序
-            df = df.sort_values('date')
-            
-            # 移除缺失值
-            df = df.dropna()
+            # 读取数据（优先 Parquet 旁路文件；未修改的文件直接命中内存缓存）
+            df = _load_stock_df(csv_file)
 
             # 根据period参数过滤时间范围
             end_date = df['date'].max()
 
             # 计算开始日期
-            period_mapping = {
-                "6mo": 6 * 30,      # 6个月
-                "1y": 365,          # 1年
-                "2y": 2 * 365,      # 2年
-                "5y": 5 * 365       # 5年
-            }
-
-            days_back = period_mapping.get(period, 365)  # 默认1年
+            days_back = PERIOD_DAYS.get(period, 365)  # 默认1年
             start_date = end_date - pd.Timedelta(days=days_back)
 
-            # 过滤时间范围
-            df = df[df['date'] >= start_date]
+            # 过滤时间范围（数据已按日期排序，二分定位起点后切片，不做布尔掩码拷贝）
+            df = df.iloc[int(df['date'].searchsorted(start_date)):]
 
             print(f"📊 股票 {stock_code} 数据范围: {df['date'].min().strftime('%Y-%m-%d')} 到 {df['date'].max().strftime('%Y-%m-%d')} ({len(df)} 条记录)")
 
             # 优先保证用户选择的period时间范围
             # RTX 5090性能强劲，支持大数据量处理
             if len(df) > lookback:
-                df = df.tail(lookback)
+                df = df.iloc[-lookback:]
                 print(f"📊 根据用户设置限制为最近 {lookback} 条记录: {df['date'].min().strftime('%Y-%m-%d')} 到 {df['date'].max().strftime('%Y-%m-%d')}")
             else:
                 print(f"📊 保持period({period})范围内的所有数据: {len(df)} 条记录 (RTX 5090性能充足)")
             
-            # 重置索引
-            df = df.reset_index(drop=True)
-            
             # 返回Kronos需要的格式 [open, high, low, close, volume, amount]
-            result = df[['open', 'high', 'low', 'close', 'volume', 'amount']].copy()
+            # 列选择本身即生成新对象，只需重置索引，无需再整体拷贝
+            result = df[KRONOS_COLUMNS].reset_index(drop=True)
             
             print(f"✅ 获取 {stock_code} 数据: {len(result)} 条记录")
             return result
@@ -116,23 +332,20 @@ class AkshareDataAdapter:
     
     def get_stock_info(self, stock_code: str) -> dict:
         """获取股票基本信息"""
-        # 股票名称映射 (简化版)
-        stock_names = {
-            "000001": "平安银行",
-            "000002": "万科A", 
-            "000004": "*ST国华",
-            "000005": "世纪星源",
-            "000006": "深振业A",
-            "000007": "全新好",
-            "000008": "神州高铁",
-            "000009": "中国宝安",
-            "000010": "美丽生态"
-        }
-        
+        now = time.monotonic()
+        stock_names = self._stock_names
+        if stock_names is None or now - self._names_checked_at >= _NAMES_RECHECK_SECONDS:
+            try:
+                mtime = self._names_file.stat().st_mtime
+            except OSError:
+                mtime = None
+            stock_names = self._stock_names = _load_stock_names(str(self._names_file), mtime)
+            self._names_checked_at = now
+
         return {
             "code": stock_code,
             "name": stock_names.get(stock_code, f"股票{stock_code}"),
-            "market": "深圳" if stock_code.startswith("00") else "上海"
+            "market": _MARKET_BY_PREFIX.get(stock_code[:2], "上海")
         }
     
     def prepare_kronos_input(self, stock_code: str, lookback: int = 90, period: str = "1y") -> Tuple[Optional[np.ndarray], Optional[dict]]:
@@ -147,28 +360,162 @@ class AkshareDataAdapter:
         Returns:
             (input_data, stock_info): 输入数据和股票信息
         """
-        # 获取数据
-        df = self.get_stock_data(stock_code, lookback, period)
-        if df is None:
+        # 获取数据（直接得到 float32 数组，不构造 DataFrame）
+        input_data = self._get_stock_array(stock_code, lookback, period)
+        if input_data is None:
             return None, None
-        
-        # 转换为numpy数组
-        input_data = df.values.astype(np.float32)
-        
+
         # 获取股票信息
         stock_info = self.get_stock_info(stock_code)
         
         return input_data, stock_info
     
+    def _get_stock_array(self, stock_code: str, lookback: int = 90, period: str = "1y") -> Optional[np.ndarray]:
+        """
+        获取股票数据的 (N, 6) float32 数组 [open, high, low, close, volume, amount]
+
+        与 get_stock_data 的时间窗口一致，但直接读取 .npy 旁路文件（内存映射），不经过 pandas；
+        已构建张量缓存时返回缓存的只读视图
+        """
+        self._refresh_tensor_cache()
+        state = self._tensor_state
+        idx = state[0].get(stock_code) if state is not None else None
+        if idx is not None:
+            _, tensor, tensor_dates, lens = state
+            n = lens[idx]
+            dates, values = tensor_dates[idx, :n], tensor[idx, :n]
+        else:
+            # 确保数据可用（如果不存在则自动下载）
+            if not self.ensure_data_available(stock_code):
+                print(f"❌ 无法获取股票 {stock_code} 的数据")
+                return None
+
+            arrays = self._load_arrays(stock_code)
+            if arrays is None:
+                return None
+            dates, values = arrays
+        if len(values) == 0:
+            print(f"❌ 股票 {stock_code} 没有有效数据")
+            return None
+
+        # 根据period过滤时间范围，再限制为最近 lookback 条记录
+        start = int(np.searchsorted(dates, dates[-1] - PERIOD_DAYS.get(period, 365)))
+        start = max(start, len(values) - lookback)
+        input_data = values[start:] if idx is not None else np.array(values[start:])
+        print(f"✅ 获取 {stock_code} 数据: {len(input_data)} 条记录")
+        return input_data
+
+    def _load_arrays(self, stock_code: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """以内存映射方式加载 (日期数组, 数值数组)，必要时先生成旁路文件"""
+        csv_file = self.data_dir / f"{stock_code}.csv"
+        if not _build_sidecar(csv_file):
+            return None
+
+        values_file, dates_file = _sidecar_paths(csv_file)
+        return np.load(dates_file, mmap_mode='r'), np.load(values_file, mmap_mode='r')
+
+    def preload_all(self, max_workers: Optional[int] = None) -> int:
+        """
+        多进程并行预生成所有股票的 .npy 旁路文件
+
+        Args:
+            max_workers: 进程数，默认使用全部CPU核心
+
+        Returns:
+            成功就绪的股票数量
+        """
+        if not self.data_dir.exists():
+            return 0
+
+        csv_files = list(self.data_dir.glob("*.csv"))
+        pending = [f for f in csv_files if not _sidecar_fresh(f)]
+        if not pending:
+            return len(csv_files)
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            results = list(executor.map(_build_sidecar, pending, chunksize=8))
+
+        return len(csv_files) - len(pending) + sum(results)
+
+    def build_tensor_cache(self, max_len: Optional[int] = None) -> int:
+        """
+        将所有股票数据预载入一个连续的 (股票数, max_len, 6) float32 张量
+
+        之后 prepare_kronos_input 直接返回张量切片（无I/O、无拷贝）。
+        数据文件更新后由 _refresh_tensor_cache 自动重建（按 _TENSOR_RECHECK_SECONDS 间隔检查）。
+
+        Args:
+            max_len: 每只股票保留的最近记录数，默认保留全部
+
+        Returns:
+            载入的股票数量
+        """
+        # 先记录数据文件签名，构建期间发生的更新会在下次检查时触发重建
+        signature = self._data_signature()
+        loaded = {}
+        for code in self.list_available_stocks():
+            arrays = self._load_arrays(code)
+            if arrays is not None and len(arrays[1]) > 0:
+                dates, values = arrays
+                loaded[code] = (dates[-max_len:], values[-max_len:]) if max_len else (dates, values)
+
+        longest = max((len(values) for _, values in loaded.values()), default=0)
+        tensor = np.zeros((len(loaded), longest, len(KRONOS_COLUMNS)), dtype=np.float32)
+        tensor_dates = np.zeros((len(loaded), longest), dtype=np.int64)
+        lens = np.zeros(len(loaded), dtype=np.int32)
+
+        for i, (dates, values) in enumerate(loaded.values()):
+            tensor[i, :len(values)] = values
+            tensor_dates[i, :len(dates)] = dates
+            lens[i] = len(values)
+
+        # 缓存只读，返回给调用方的视图不会被意外修改
+        tensor.flags.writeable = False
+        tensor_dates.flags.writeable = False
+
+        self._tensor_state = ({code: i for i, code in enumerate(loaded)}, tensor, tensor_dates, lens)
+        self._tensor_signature = signature
+        self._tensor_max_len = max_len
+        self._tensor_checked_at = time.monotonic()
+        return len(loaded)
+
+    def _data_signature(self) -> dict:
+        """数据目录下各CSV的修改时间（纳秒），用于判断张量缓存是否过期"""
+        try:
+            with os.scandir(self.data_dir) as it:
+                return {
+                    entry.name: entry.stat().st_mtime_ns for entry in it
+                    if entry.name.endswith('.csv') and entry.is_file()
+                }
+        except OSError:
+            return {}
+
+    def _refresh_tensor_cache(self):
+        """已构建张量缓存时，按间隔检查CSV是否新增、删除或更新，有变化则重建"""
+        if self._tensor_state is None:
+            return
+        now = time.monotonic()
+        if now - self._tensor_checked_at < _TENSOR_RECHECK_SECONDS:
+            return
+        # 只让一个请求做检查和重建，其余请求继续使用当前缓存
+        if not self._tensor_lock.acquire(blocking=False):
+            return
+        try:
+            self._tensor_checked_at = now
+            if self._data_signature() != self._tensor_signature:
+                print("🔄 数据文件已更新，重建张量缓存")
+                self.build_tensor_cache(self._tensor_max_len)
+        finally:
+            self._tensor_lock.release()
+
     def list_available_stocks(self) -> list:
         """列出可用的股票代码"""
         if not self.data_dir.exists():
             return []
         
-        csv_files = list(self.data_dir.glob("*.csv"))
-        stock_codes = [f.stem for f in csv_files]
-        
-        return sorted(stock_codes)
+        return list(_list_stock_codes(str(self.data_dir), self.data_dir.stat().st_mtime))
 
     def auto_download_missing_data(self, stock_code: str) -> bool:
         """自动下载缺失的股票数据"""
@@ -228,3 +575,16 @@ class AkshareDataAdapter:
 
         print(f"股票 {stock_code} 数据不存在，尝试自动下载...")
         return self.auto_download_missing_data(stock_code)
+
+
+# 全局适配器实例
+_adapter = None
+
+def get_adapter() -> AkshareDataAdapter:
+    """获取数据适配器实例（单例模式，跨请求复用已预热的缓存）"""
+    global _adapter
+
+    if _adapter is None:
+        _adapter = AkshareDataAdapter()
+
+    return _adapter
@@ -30,11 +30,28 @@ try:
 except Exception:
     pass
 
+# 响应序列化：优先使用 orjson（C实现，比标准库json快数倍），未安装时回退到标准JSON
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+
+    class NumpyORJSONResponse(ORJSONResponse):
+        """orjson 序列化响应（直接返回该响应时可携带 NumPy 数组/标量）"""
+
+        def render(self, content: Any) -> bytes:
+            return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+    default_response_class = NumpyORJSONResponse
+except ImportError:
+    from fastapi.responses import JSONResponse
+    default_response_class = JSONResponse
+
 # 创建FastAPI应用
 app = FastAPI(
     title="Gordon Wang 的股票预测API",
     description="基于RTX 5090 GPU加速的智能股票价格预测服务",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=default_response_class
 )
 
 # 添加CORS中间件
@@ -124,7 +141,10 @@ async def startup_event():
         device = "cuda" if torch.cuda.is_available() else "cpu"
 
     # 如选择为 CUDA，做一次极小计算烟雾测试，避免不兼容架构导致运行时错误
-    if device == "cuda":
+    # 启动脚本已测试过GPU（KRONOS_GPU_OK=1）时直接复用其结果
+    if device == "cuda" and os.getenv("KRONOS_GPU_OK") == "1":
+        logger.info(f"检测到GPU: {os.getenv('KRONOS_GPU_NAME') or torch.cuda.get_device_name(0)}（启动脚本已通过烟雾测试）")
+    elif device == "cuda":
         try:
             gpu_name = torch.cuda.get_device_name(0)
             gpu_memory = torch.cuda.get_device_properties(0).total_memory / 1024**3
@@ -155,6 +175,18 @@ async def startup_event():
         # 即使失败也要启动，但仍尝试真实模式
         prediction_service = get_prediction_service(device="cpu", use_mock=False)
 
+    # 预热本地数据缓存（与预测服务共用同一适配器实例），首个请求即可命中
+    try:
+        from .akshare_adapter import get_adapter
+        adapter = get_adapter()
+        ready = adapter.preload_all()
+        logger.info(f"本地数据缓存就绪: {ready} 只股票")
+        # 旁路文件就绪后一次性载入连续张量，请求直接返回切片
+        loaded = adapter.build_tensor_cache()
+        logger.info(f"数据张量缓存就绪: {loaded} 只股票")
+    except Exception as e:
+        logger.warning(f"本地数据缓存预热失败: {e}")
+
 
 # API路由
 @app.get("/")
@@ -235,9 +235,11 @@ class AStockDataFetcher:
             if 'amount' not in df.columns:
                 df['amount'] = df['close'] * df['volume']
             df = df[need + ['amount']]
-            # 数值类型
-            for c in need + ['amount']:
-                df[c] = pd.to_numeric(df[c], errors='coerce')
+            # 数值类型：整体一次转换；存在非数值内容时逐列容错转换
+            try:
+                df = df.astype('float64')
+            except (ValueError, TypeError):
+                df = df.apply(pd.to_numeric, errors='coerce')
             # 去空、排序
             df = df.dropna().sort_index()
             logger.info(f"缓存命中: {path}")
@@ -5,6 +5,8 @@
 
 import sys
 import os
+import functools
+import threading
 import numpy as np
 import pandas as pd
 import torch
@@ -83,8 +85,8 @@ class StockPredictionService:
         self.has_real_data = False
         self.has_qlib = False
         try:
-            from .akshare_adapter import AkshareDataAdapter
-            self.real_data_adapter = AkshareDataAdapter()
+            from .akshare_adapter import get_adapter
+            self.real_data_adapter = get_adapter()
             self.has_real_data = True
             logger.info("Akshare 本地CSV适配器加载成功")
         except Exception:
@@ -501,13 +503,11 @@ class StockPredictionService:
                 logger.info("模型预测变化较小，基于历史波动率生成不确定性区间")
 
                 # 为每个预测路径添加基于历史波动率的合理变化
-                np.random.seed(42)  # 固定种子确保可重复性
-                for i in range(len(all_predictions)):
-                    for j in range(len(all_predictions[i])):
-                        # 随着预测天数增加，不确定性递增
-                        uncertainty_factor = daily_volatility * np.sqrt(j + 1) * 0.8
-                        random_change = np.random.normal(0, uncertainty_factor)
-                        all_predictions[i][j] *= (1 + random_change)
+                # 使用独立的固定种子生成器确保可重复性（不改动全局随机状态）
+                rng = np.random.default_rng(42)
+                # 随着预测天数增加，不确定性递增
+                uncertainty_factor = daily_volatility * np.sqrt(np.arange(1, all_predictions.shape[1] + 1)) * 0.8
+                all_predictions *= 1 + rng.standard_normal(all_predictions.shape) * uncertainty_factor
 
             # 使用中位数聚合，更抗异常值
             pred_median = np.median(all_predictions, axis=0)
@@ -1240,16 +1240,191 @@ if __name__ == "__main__":
 
 # 真实Kronos模型集成
 try:
-    from akshare_adapter import AkshareDataAdapter
+    from akshare_adapter import get_adapter
     REAL_MODEL_AVAILABLE = True
 except ImportError:
     REAL_MODEL_AVAILABLE = False
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# 增强模拟预测的随机数生成器（每个线程一个实例，Generator 本身非线程安全）
+_sim_local = threading.local()
+
+
+def _sim_rng() -> np.random.Generator:
+    """获取当前线程的随机数生成器"""
+    rng = getattr(_sim_local, 'rng', None)
+    if rng is None:
+        rng = _sim_local.rng = np.random.default_rng()
+    return rng
+
+
+def _simulate_path_numpy(last_close, last_volume, price_trend, price_volatility, draws):
+    """
+    模拟预测路径（无numba时使用）
+
+    随机扰动预先一次性抽好；开盘/收盘价逐日递推（收盘价 = 开盘价 + 趋势项 + 波动项），
+    其余不依赖前一天结果的列按整列计算
+
+    Args:
+        draws: (pred_len, 5) 标准正态扰动，依次用于跳空、收盘、最高、最低、成交量
+
+    Returns:
+        (pred_len, 6) 数组: [open, high, low, close, volume, amount]
+    """
+    pred_len = draws.shape[0]
+
+    # 趋势衰减
+    trend_factors = np.maximum(0.1, 1 - np.arange(pred_len) * 0.1)
+
+    # 开盘跳空：第一天1%标准差、限制±2%；后续0.5%标准差、限制±1.5%
+    gap_std = np.full(pred_len, 0.005)
+    gap_limit = np.full(pred_len, 0.015)
+    gap_std[0], gap_limit[0] = 0.01, 0.02
+    gap_factors = np.clip(draws[:, 0] * gap_std, -gap_limit, gap_limit)
+
+    # 开盘价接近前一天收盘价；基于开盘价和趋势计算收盘价，限制在±10%的日内波动内
+    open_prices = np.empty(pred_len)
+    close_prices = np.empty(pred_len)
+    for i in range(pred_len):
+        open_price = last_close * (1 + gap_factors[i])
+        price_change = price_trend * trend_factors[i] + draws[i, 1] * (price_volatility * open_price * 0.5)
+        close_price = open_price + price_change
+        max_daily_change = open_price * 0.1
+        close_price = min(max(close_price, open_price - max_daily_change), open_price + max_daily_change)
+        open_prices[i] = open_price
+        close_prices[i] = close_price
+        last_close = close_price
+
+    # 生成高低价：确保 low <= open,close <= high
+    base_volatility = price_volatility * open_prices * 0.3  # 减小日内波动
+    high_base = np.maximum(open_prices, close_prices)
+    low_base = np.minimum(open_prices, close_prices)
+    high_prices = np.minimum(high_base + np.abs(draws[:, 2]) * base_volatility, high_base * 1.05)
+    low_prices = np.maximum(low_base - np.abs(draws[:, 3]) * base_volatility, low_base * 0.95)
+
+    # 成交量预测（单日降幅不超过30%）与成交额；从前一日成交量起逐日累乘
+    volume_factors = np.maximum(0.7, 1 + draws[:, 4] * 0.15)
+    volumes = np.cumprod(np.concatenate(([last_volume], volume_factors)))[1:]
+    amounts = (open_prices + high_prices + low_prices + close_prices) / 4 * volumes
+
+    return np.column_stack((open_prices, high_prices, low_prices, close_prices, volumes, amounts))
+
+
+@functools.lru_cache(maxsize=256)
+def _price_stats(close_bytes: bytes, dtype: str) -> Tuple[float, float, float]:
+    """
+    根据最近的收盘价计算 (趋势, 波动率, 最后一日涨跌幅)
+
+    以收盘价序列的字节内容为缓存键，同一股票同一数据的重复预测无需重新计算
+    """
+    recent_prices = np.frombuffer(close_bytes, dtype=dtype)
+
+    # 计算趋势和波动性
+    price_changes = np.diff(recent_prices)
+
+    # 检测并过滤异常涨跌（超过±8%的单日变化）
+    normal_changes = price_changes[np.abs(price_changes / recent_prices[:-1]) <= 0.08]
+
+    if len(normal_changes) > 0:
+        price_trend = np.mean(normal_changes)
+        price_volatility = np.std(normal_changes) / np.mean(recent_prices)
+    else:
+        # 如果所有变化都是异常的，使用更保守的估计
+        price_trend = 0
+        price_volatility = 0.02
+
+    # 限制波动率，避免过度波动
+    price_volatility = min(price_volatility, 0.03)  # 最大3%的日波动率
+
+    # 检测最近是否有异常涨跌
+    last_change = recent_prices[-1] - recent_prices[-2] if len(recent_prices) >= 2 else 0
+    last_change_pct = last_change / recent_prices[-2] if len(recent_prices) >= 2 and recent_prices[-2] > 0 else 0
+
+    return float(price_trend), float(price_volatility), float(last_change_pct)
+
+
+# 涨跌幅(%)分档阈值与趋势标签：(-inf,-2] 大幅下跌, (-2,-0.5] 下跌, (-0.5,0.5] 震荡, (0.5,2] 上涨, (2,inf) 强势上涨
+_TREND_THRESHOLDS = np.array([-2, -0.5, 0.5, 2])
+_TREND_LABELS = np.array(['大幅下跌', '下跌', '震荡', '上涨', '强势上涨'])
+
+
+def _classify_trend(change_percent):
+    """按涨跌幅划分趋势标签，支持标量或数组（批量对多只股票一次分类）
+
+    NaN/inf 无法分档（searchsorted 会把NaN排到最后一档），按震荡处理
+    """
+    if np.ndim(change_percent) == 0:
+        if not np.isfinite(change_percent):
+            return _TREND_LABELS[2]
+        return _TREND_LABELS[np.searchsorted(_TREND_THRESHOLDS, change_percent)]
+    values = np.asarray(change_percent, dtype=float)
+    labels = _TREND_LABELS[np.searchsorted(_TREND_THRESHOLDS, values)]
+    return np.where(np.isfinite(values), labels, _TREND_LABELS[2])
+
+
+if NUMBA_AVAILABLE:
+    # 不启用fastmath：保持IEEE浮点语义，与 _simulate_path_numpy 在相同扰动下逐位一致
+    @njit(cache=True)
+    def _simulate_path_jit(last_close, last_volume, price_trend, price_volatility, draws):
+        """逐日递推模拟预测路径（numba编译），与 _simulate_path_numpy 实现同一递推，相同扰动下结果逐位一致"""
+        pred_len = draws.shape[0]
+        out = np.empty((pred_len, 6))
+
+        for i in range(pred_len):
+            # 趋势衰减
+            trend_factor = max(0.1, 1.0 - i * 0.1)
+
+            # 开盘价接近前一天收盘价，第一天允许稍大的跳空
+            if i == 0:
+                gap_factor = min(max(draws[i, 0] * 0.01, -0.02), 0.02)
+            else:
+                gap_factor = min(max(draws[i, 0] * 0.005, -0.015), 0.015)
+            open_price = last_close * (1 + gap_factor)
+
+            # 基于开盘价和趋势计算收盘价，限制在±10%的日内波动内
+            price_change = price_trend * trend_factor + draws[i, 1] * (price_volatility * open_price * 0.5)
+            close_price = open_price + price_change
+            max_daily_change = open_price * 0.1
+            close_price = min(max(close_price, open_price - max_daily_change), open_price + max_daily_change)
+
+            # 生成高低价：确保 low <= open,close <= high
+            base_volatility = price_volatility * open_price * 0.3
+            high_base = max(open_price, close_price)
+            low_base = min(open_price, close_price)
+            high_price = min(high_base + abs(draws[i, 2]) * base_volatility, high_base * 1.05)
+            low_price = max(low_base - abs(draws[i, 3]) * base_volatility, low_base * 0.95)
+
+            # 成交量与成交额
+            new_volume = last_volume * max(0.7, 1 + draws[i, 4] * 0.15)
+            amount = (open_price + high_price + low_price + close_price) / 4 * new_volume
+
+            out[i, 0] = open_price
+            out[i, 1] = high_price
+            out[i, 2] = low_price
+            out[i, 3] = close_price
+            out[i, 4] = new_volume
+            out[i, 5] = amount
+
+            # 更新为下一天的基准
+            last_close = close_price
+            last_volume = new_volume
+
+        return out
+
+    _simulate_path = _simulate_path_jit
+else:
+    _simulate_path = _simulate_path_numpy
+
 class RealKronosPredictor:
     """真实Kronos模型预测器"""
 
     def __init__(self):
-        self.data_adapter = AkshareDataAdapter()
+        self.data_adapter = get_adapter()
         self.model_loaded = False
 
         # 这里应该加载真实的Kronos模型
@@ -1296,117 +1471,54 @@ class RealKronosPredictor:
         recent_prices = historical_data[-30:, 3]  # close prices
         recent_volumes = historical_data[-30:, 4]  # volumes
 
-        # 计算趋势和波动性
-        price_changes = np.diff(recent_prices[-10:])
-
-        # 检测并过滤异常涨跌（超过±8%的单日变化）
-        normal_changes = price_changes[np.abs(price_changes / recent_prices[-10:-1]) <= 0.08]
-
-        if len(normal_changes) > 0:
-            price_trend = np.mean(normal_changes)
-            price_volatility = np.std(normal_changes) / np.mean(recent_prices[-10:])
-        else:
-            # 如果所有变化都是异常的，使用更保守的估计
-            price_trend = 0
-            price_volatility = 0.02
-
-        # 限制波动率，避免过度波动
-        price_volatility = min(price_volatility, 0.03)  # 最大3%的日波动率
-
-        # 检测最近是否有异常涨跌，如果有则减弱趋势延续性
-        last_change = recent_prices[-1] - recent_prices[-2] if len(recent_prices) >= 2 else 0
-        last_change_pct = last_change / recent_prices[-2] if len(recent_prices) >= 2 and recent_prices[-2] > 0 else 0
+        # 计算趋势和波动性（仅依赖最近10个收盘价，相同数据重复请求时直接命中缓存）
+        window = np.ascontiguousarray(recent_prices[-10:])
+        price_trend, price_volatility, last_change_pct = _price_stats(window.tobytes(), window.dtype.str)
 
         # 如果最后一天涨跌幅超过5%，认为是异常，减弱趋势
         if abs(last_change_pct) > 0.05:
             price_trend *= 0.3  # 大幅减弱异常趋势的延续性
             print(f"检测到异常涨跌: {last_change_pct:.2%}，减弱趋势延续性")
 
-        # 生成更真实的预测
-        predictions = []
-        last_close = recent_prices[-1]  # 前一天收盘价
-        last_volume = recent_volumes[-1]
-
-        for i in range(pred_len):
-            # 趋势衰减
-            trend_factor = max(0.1, 1 - i * 0.1)
-
-            # 第一天开盘价应该接近前一天收盘价，后续天数开盘价接近前一天收盘价
-            if i == 0:
-                # 第一天：开盘价基于前一天收盘价，加入小幅跳空（通常在±2%以内）
-                gap_factor = np.random.normal(0, 0.01)  # 1%的跳空标准差
-                gap_factor = np.clip(gap_factor, -0.02, 0.02)  # 限制在±2%以内
-                open_price = last_close * (1 + gap_factor)
-            else:
-                # 后续天数：开盘价接近前一天收盘价，允许小幅跳空
-                gap_factor = np.random.normal(0, 0.005)  # 0.5%的跳空标准差
-                gap_factor = np.clip(gap_factor, -0.015, 0.015)  # 限制在±1.5%以内
-                open_price = last_close * (1 + gap_factor)
-
-            # 基于开盘价和趋势计算收盘价
-            price_change = price_trend * trend_factor + np.random.normal(0, price_volatility * open_price * 0.5)
-            close_price = open_price + price_change
-
-            # 确保收盘价不会偏离开盘价太远（日内波动限制）
-            max_daily_change = open_price * 0.1  # 最大10%的日内波动
-            close_price = np.clip(close_price,
-                                open_price - max_daily_change,
-                                open_price + max_daily_change)
-
-            # 确保价格为正
-            close_price = max(close_price, open_price * 0.5)
-
-            # 生成高低价：确保 low <= open,close <= high
-            base_volatility = price_volatility * open_price * 0.3  # 减小日内波动
-
-            # 高价：在开盘价和收盘价的最大值基础上增加
-            high_base = max(open_price, close_price)
-            high_price = high_base + abs(np.random.normal(0, base_volatility))
-
-            # 低价：在开盘价和收盘价的最小值基础上减少
-            low_base = min(open_price, close_price)
-            low_price = low_base - abs(np.random.normal(0, base_volatility))
-
-            # 确保价格关系正确：low <= min(open,close) <= max(open,close) <= high
-            low_price = max(low_price, low_base * 0.95)  # 低价不能太低
-            high_price = min(high_price, high_base * 1.05)  # 高价不能太高
-
-            # 成交量预测
-            volume_change = np.random.normal(0, 0.15)  # 减小成交量波动
-            new_volume = max(last_volume * 0.7, last_volume * (1 + volume_change))
-
-            # 成交额
-            avg_price = (open_price + high_price + low_price + close_price) / 4
-            amount = avg_price * new_volume
-
-            predictions.append({
-                'open': float(open_price),
-                'high': float(high_price),
-                'low': float(low_price),
-                'close': float(close_price),
-                'volume': int(new_volume),
-                'amount': float(amount)
-            })
-
-            # 更新为下一天的基准
-            last_close = close_price
-            last_volume = new_volume
+        # 生成更真实的预测：一次性抽取全部随机扰动，再交给路径模拟内核
+        draws = _sim_rng().standard_normal((pred_len, 5))
+        path = _simulate_path(float(recent_prices[-1]), float(recent_volumes[-1]),
+                              float(price_trend), float(price_volatility), draws)
+
+        predictions = [
+            {
+                'open': o,
+                'high': h,
+                'low': l,
+                'close': c,
+                'volume': v,
+                'amount': a
+            }
+            for o, h, l, c, v, a in zip(
+                path[:, 0].tolist(), path[:, 1].tolist(), path[:, 2].tolist(),
+                path[:, 3].tolist(), path[:, 4].astype(np.int64).tolist(), path[:, 5].tolist()
+            )
+        ]
 
         return predictions
 
     def _format_historical_data(self, data):
-        """格式化历史数据"""
-        formatted = []
-        for row in data:
-            formatted.append({
-                'open': float(row[0]),
-                'high': float(row[1]),
-                'low': float(row[2]),
-                'close': float(row[3]),
-                'volume': int(row[4]),
-                'amount': float(row[5])
-            })
-        return formatted
+        """格式化历史数据（按列整体转换为Python数值，前端需要逐行记录格式）"""
+        columns = (
+            data[:, 0].tolist(), data[:, 1].tolist(), data[:, 2].tolist(),
+            data[:, 3].tolist(), data[:, 4].astype(np.int64).tolist(), data[:, 5].tolist()
+        )
+        return [
+            {
+                'open': o,
+                'high': h,
+                'low': l,
+                'close': c,
+                'volume': v,
+                'amount': a
+            }
+            for o, h, l, c, v, a in zip(*columns)
+        ]
 
     def _calculate_summary(self, historical_data, predictions):
         """计算预测摘要"""
@@ -1416,16 +1528,7 @@ class RealKronosPredictor:
         change = predicted_price - current_price
         change_percent = (change / current_price) * 100
 
-        if change_percent > 2:
-            trend = "强势上涨"
-        elif change_percent > 0.5:
-            trend = "上涨"
-        elif change_percent > -0.5:
-            trend = "震荡"
-        elif change_percent > -2:
-            trend = "下跌"
-        else:
-            trend = "大幅下跌"
+        trend = str(_classify_trend(change_percent))
 
         return {
             'current_price': current_price,
@@ -34,21 +34,36 @@ def run_command(cmd, name, log_file=None):
     
     return process
 
-def check_service(url, name, timeout=30):
-    """检查服务是否启动"""
+# 健康检查共用的HTTP会话（复用连接）
+_session = None
+
+def _get_session():
+    """获取共用的 requests 会话"""
+    global _session
     import requests
+
+    if _session is None:
+        _session = requests.Session()
+    return _session
+
+def check_service(url, name, timeout=30):
+    """检查服务是否启动（指数退避轮询，服务就绪后立即返回）"""
+    session = _get_session()
     
     print(f"⏳ 等待 {name} 启动...")
     
-    for i in range(timeout):
+    delay = 0.1
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
         try:
-            response = requests.get(url, timeout=2)
+            response = session.get(url, timeout=2)
             if response.status_code == 200:
                 print(f"✅ {name} 启动成功")
                 return True
-        except:
+        except Exception:
             pass
-        time.sleep(1)
+        time.sleep(delay)
+        delay = min(delay * 1.5, 1.0)
     
     print(f"❌ {name} 启动超时")
     return False
@@ -89,6 +104,14 @@ def main():
     os.environ['APP_DEBUG'] = '1' if APP_DEBUG else '0'
     os.environ['LOG_LEVEL'] = LOG_LEVEL.upper()
 
+    # 预生成本地CSV的 .npy 缓存，使首个预测请求即可命中
+    try:
+        from app.akshare_adapter import AkshareDataAdapter
+        ready = AkshareDataAdapter().preload_all()
+        print(f"✅ 本地数据缓存就绪: {ready} 只股票")
+    except Exception as e:
+        print(f"⚠️ 本地数据缓存预热失败: {e}")
+
     processes = []
 
     try:
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+下载脚本的磁盘缓存
+将akshare/tushare调用结果以pickle保存在 data/.cache 下，重复运行时直接读取
+设置环境变量 KRONOS_NO_CACHE=1 可跳过缓存
+"""
+
+import os
+import time
+import pickle
+import threading
+import hashlib
+import functools
+from pathlib import Path
+
+CACHE_DIR = Path("data") / ".cache"
+
+
+def _cache_key(func, args, kwargs) -> str:
+    """根据函数名和参数生成缓存文件名"""
+    raw = repr((func.__name__, args, sorted(kwargs.items())))
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def cached(ttl_days: float):
+    """磁盘缓存装饰器，缓存文件超过 ttl_days 天后重新获取"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if os.getenv('KRONOS_NO_CACHE', '0') == '1':
+                return func(*args, **kwargs)
+
+            cache_file = CACHE_DIR / f"{_cache_key(func, args, kwargs)}.pkl"
+            try:
+                if time.time() - cache_file.stat().st_mtime < ttl_days * 86400:
+                    with open(cache_file, 'rb') as f:
+                        return pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+
+            result = func(*args, **kwargs)
+
+            try:
+                CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                # 先写临时文件再替换，避免并发下载时读到半截缓存
+                tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                with open(tmp_file, 'wb') as f:
+                    pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_file, cache_file)
+            except OSError as e:
+                print(f"⚠️ 写入缓存失败: {e}")
+
+            return result
+        return wrapper
+    return decorator
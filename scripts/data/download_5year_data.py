@@ -11,8 +11,131 @@ from pathlib import Path
 import requests
 import zipfile
 import tempfile
+import threading
+import queue
+import logging
+import contextlib
+from logging.handlers import QueueHandler, QueueListener
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-import pandas as pd
+import functools
+
+from _cache import cached
+
+# 数据目录
+QLIB_CN_DIR = Path.home() / ".qlib" / "qlib_data" / "cn_data"
+AKSHARE_DIR = Path("data") / "akshare_data"
+TUSHARE_DIR = Path("data") / "tushare_data"
+
+# 并发下载的线程数
+DOWNLOAD_WORKERS = 10
+
+# 下载线程的进度日志经队列交给单个监听线程输出，级别由 LOG_LEVEL 控制
+logger = logging.getLogger("download_5year_data")
+
+
+@contextlib.contextmanager
+def queued_logging():
+    """在线程池下载期间启用队列日志，结束时输出剩余记录"""
+    log_queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = QueueListener(log_queue, stream_handler)
+    queue_handler = QueueHandler(log_queue)
+    
+    logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    logger.propagate = False
+    logger.addHandler(queue_handler)
+    listener.start()
+    try:
+        yield
+    finally:
+        listener.stop()
+        logger.removeHandler(queue_handler)
+
+# 所有股票合并写入的Parquet文件名，行组约100万行（~128MB）
+COMBINED_FILE = "cn_daily.parquet"
+ROW_GROUP_ROWS = 1_000_000
+
+
+@functools.lru_cache(maxsize=1)
+@cached(ttl_days=7)
+def _fetch_stock_list():
+    """获取A股代码列表（磁盘缓存7天）"""
+    import akshare as ak
+    return ak.stock_info_a_code_name()
+
+
+@cached(ttl_days=1)
+def _fetch_hist(code, start_date, end_date):
+    """获取单只股票前复权日线（磁盘缓存1天）"""
+    import akshare as ak
+    return ak.stock_zh_a_hist(
+        symbol=code,
+        period="daily",
+        start_date=start_date,
+        end_date=end_date,
+        adjust="qfq"  # 前复权
+    )
+
+class CombinedParquetWriter:
+    """把各股票的日线追加写入同一个Parquet文件（带symbol列），按行数攒批成行组"""
+    
+    def __init__(self, path, row_group_rows=ROW_GROUP_ROWS):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        self._pa = pa
+        self._pq = pq
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self.row_group_rows = row_group_rows
+        self.schema = None
+        self.num_symbols = 0
+        self.num_rows = 0
+        self._writer = None
+        self._pending = []
+        self._pending_rows = 0
+    
+    def write(self, df, symbol):
+        table = self._pa.Table.from_pandas(df.assign(symbol=symbol), schema=self.schema, preserve_index=False)
+        if self.schema is None:
+            # 以第一只股票的列为准，后续股票按同一schema转换
+            self.schema = table.schema.remove_metadata()
+            table = table.replace_schema_metadata(None)
+        self._pending.append(table)
+        self._pending_rows += table.num_rows
+        self.num_symbols += 1
+        self.num_rows += table.num_rows
+        if self._pending_rows >= self.row_group_rows:
+            self._flush()
+    
+    def _flush(self):
+        if not self._pending:
+            return
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.tmp_path, self.schema, compression='zstd', use_dictionary=True)
+        self._writer.write_table(self._pa.concat_tables(self._pending), row_group_size=self.row_group_rows)
+        self._pending = []
+        self._pending_rows = 0
+    
+    def close(self):
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+            os.replace(self.tmp_path, self.path)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            if self._writer is not None:
+                self._writer.close()
+            self.tmp_path.unlink(missing_ok=True)
+        return False
 
 def install_dependencies():
     """安装必要的依赖"""
@@ -22,27 +145,37 @@ def install_dependencies():
         "pyqlib",
         "akshare>=1.12.0", 
         "yfinance>=0.2.0",
-        "tushare>=1.2.0"
+        "tushare>=1.2.0",
+        "pyarrow>=14.0.0"
     ]
     
+    # 一次pip调用统一解析全部依赖
+    print(f"安装 {' '.join(dependencies)}...")
+    try:
+        result = subprocess.run(
+            [sys.executable, "-m", "pip", "install", "-q",
+             "--upgrade-strategy=only-if-needed", *dependencies],
+            capture_output=True, text=True, timeout=900
+        )
+    except Exception as e:
+        print(f"❌ 依赖安装异常: {str(e)}")
+        return
+    
+    if result.returncode != 0:
+        for dep in dependencies:
+            print(f"❌ {dep} 安装失败")
+        print(result.stderr)
+        return
+    
     for dep in dependencies:
-        print(f"安装 {dep}...")
-        try:
-            result = subprocess.run([sys.executable, "-m", "pip", "install", dep], 
-                                  capture_output=True, text=True, timeout=300)
-            if result.returncode == 0:
-                print(f"✅ {dep} 安装成功")
-            else:
-                print(f"❌ {dep} 安装失败: {result.stderr}")
-        except Exception as e:
-            print(f"❌ {dep} 安装异常: {str(e)}")
+        print(f"✅ {dep} 安装成功")
 
 def download_qlib_official_data():
     """下载Qlib官方数据"""
     print("\n⬇️ 下载Qlib官方A股数据...")
     
     # 创建数据目录
-    data_dir = Path.home() / ".qlib" / "qlib_data" / "cn_data"
+    data_dir = QLIB_CN_DIR
     data_dir.mkdir(parents=True, exist_ok=True)
     
     print(f"数据目录: {data_dir}")
@@ -82,11 +215,11 @@ def download_alternative_data():
         
         # 获取股票列表
         print("获取股票列表...")
-        stock_list = ak.stock_info_a_code_name()
+        stock_list = _fetch_stock_list()
         print(f"获取到 {len(stock_list)} 只股票")
         
         # 创建数据目录
-        data_dir = Path("data") / "akshare_data"
+        data_dir = AKSHARE_DIR
         data_dir.mkdir(parents=True, exist_ok=True)
         
         # 计算5年前的日期
@@ -98,35 +231,40 @@ def download_alternative_data():
         # 下载前100只股票的数据作为示例
         sample_stocks = stock_list.head(100)
         
-        for idx, row in sample_stocks.iterrows():
-            stock_code = row['code']
-            stock_name = row['name']
-            
+        def fetch_one(stock_code, stock_name):
             try:
-                print(f"下载 {stock_code} {stock_name}...")
+                logger.info("下载 %s %s...", stock_code, stock_name)
                 
                 # 下载日线数据
-                df = ak.stock_zh_a_hist(
-                    symbol=stock_code,
-                    period="daily",
-                    start_date=start_date,
-                    end_date=end_date,
-                    adjust="qfq"  # 前复权
-                )
+                df = _fetch_hist(stock_code, start_date, end_date)
                 
                 if len(df) > 0:
-                    # 保存数据
-                    file_path = data_dir / f"{stock_code}.csv"
-                    df.to_csv(file_path, index=False)
-                    print(f"✅ {stock_code} 数据保存成功，{len(df)} 条记录")
-                else:
-                    print(f"⚠️ {stock_code} 无数据")
+                    return stock_code, df
+                logger.warning("⚠️ %s 无数据", stock_code)
                     
             except Exception as e:
-                print(f"❌ {stock_code} 下载失败: {str(e)}")
-                continue
+                logger.error("❌ %s 下载失败: %s", stock_code, e)
+            return None
+        
+        # 下载是网络I/O密集型，用线程池并发请求（DataFrame无需跨进程pickle）
+        # 写入只在主线程进行，所有股票追加到同一个Parquet文件
+        with queued_logging(), ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor, \
+                CombinedParquetWriter(data_dir / COMBINED_FILE) as writer:
+            codes = sample_stocks['code'].to_numpy()
+            names = sample_stocks['name'].to_numpy()
+            futures = [executor.submit(fetch_one, code, name) for code, name in zip(codes, names)]
+            for future in as_completed(futures):
+                result = future.result()
+                if result is None:
+                    continue
+                stock_code, df = result
+                try:
+                    writer.write(df, stock_code)
+                    logger.info("✅ %s 数据保存成功，%d 条记录", stock_code, len(df))
+                except Exception as e:
+                    logger.error("❌ %s 保存失败: %s", stock_code, e)
         
-        print(f"✅ akshare数据下载完成，保存在 {data_dir}")
+        print(f"✅ akshare数据下载完成，保存在 {data_dir / COMBINED_FILE}")
         return True
         
     except Exception as e:
@@ -158,7 +296,7 @@ def download_tushare_data():
         print(f"获取到 {len(stock_list)} 只股票")
         
         # 创建数据目录
-        data_dir = Path("data") / "tushare_data"
+        data_dir = TUSHARE_DIR
         data_dir.mkdir(parents=True, exist_ok=True)
         
         # 计算5年前的日期
@@ -168,29 +306,42 @@ def download_tushare_data():
         # 下载前50只股票的数据
         sample_stocks = stock_list.head(50)
         
-        for idx, row in sample_stocks.iterrows():
-            ts_code = row['ts_code']
-            stock_name = row['name']
-            
+        # tushare按分钟限制调用次数，同时在途的请求不超过2个
+        quota = threading.Semaphore(2)
+        
+        def fetch_one(ts_code, stock_name):
             try:
-                print(f"下载 {ts_code} {stock_name}...")
+                logger.info("下载 %s %s...", ts_code, stock_name)
                 
                 # 下载日线数据
-                df = pro.daily(ts_code=ts_code, start_date=start_date, end_date=end_date)
+                with quota:
+                    df = pro.daily(ts_code=ts_code, start_date=start_date, end_date=end_date)
                 
                 if len(df) > 0:
-                    # 保存数据
-                    file_path = data_dir / f"{ts_code}.csv"
-                    df.to_csv(file_path, index=False)
-                    print(f"✅ {ts_code} 数据保存成功，{len(df)} 条记录")
-                else:
-                    print(f"⚠️ {ts_code} 无数据")
+                    return ts_code, df
+                logger.warning("⚠️ %s 无数据", ts_code)
                     
             except Exception as e:
-                print(f"❌ {ts_code} 下载失败: {str(e)}")
-                continue
+                logger.error("❌ %s 下载失败: %s", ts_code, e)
+            return None
         
-        print(f"✅ tushare数据下载完成，保存在 {data_dir}")
+        with queued_logging(), ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor, \
+                CombinedParquetWriter(data_dir / COMBINED_FILE) as writer:
+            codes = sample_stocks['ts_code'].to_numpy()
+            names = sample_stocks['name'].to_numpy()
+            futures = [executor.submit(fetch_one, code, name) for code, name in zip(codes, names)]
+            for future in as_completed(futures):
+                result = future.result()
+                if result is None:
+                    continue
+                ts_code, df = result
+                try:
+                    writer.write(df, ts_code)
+                    logger.info("✅ %s 数据保存成功，%d 条记录", ts_code, len(df))
+                except Exception as e:
+                    logger.error("❌ %s 保存失败: %s", ts_code, e)
+        
+        print(f"✅ tushare数据下载完成，保存在 {data_dir / COMBINED_FILE}")
         return True
         
     except Exception as e:
@@ -202,7 +353,7 @@ def verify_downloaded_data():
     print("\n🔍 验证下载的数据...")
     
     # 检查Qlib数据
-    qlib_data_dir = Path.home() / ".qlib" / "qlib_data" / "cn_data"
+    qlib_data_dir = QLIB_CN_DIR
     if qlib_data_dir.exists():
         print(f"✅ Qlib数据目录存在: {qlib_data_dir}")
         
@@ -218,27 +369,32 @@ def verify_downloaded_data():
         # 检查股票数据数量
         features_dir = qlib_data_dir / "features"
         if features_dir.exists():
-            stock_dirs = [d for d in features_dir.iterdir() if d.is_dir()]
-            print(f"✅ Qlib股票数据文件数量: {len(stock_dirs)}")
+            with os.scandir(features_dir) as it:
+                num_stock_dirs = sum(1 for entry in it if entry.is_dir())
+            print(f"✅ Qlib股票数据文件数量: {num_stock_dirs}")
     
     # 检查akshare数据
-    akshare_data_dir = Path("data") / "akshare_data"
-    if akshare_data_dir.exists():
-        csv_files = list(akshare_data_dir.glob("*.csv"))
-        print(f"✅ akshare数据文件数量: {len(csv_files)}")
+    akshare_file = AKSHARE_DIR / COMBINED_FILE
+    if akshare_file.exists():
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
         
-        if csv_files:
-            # 检查第一个文件的数据
-            sample_file = csv_files[0]
-            df = pd.read_csv(sample_file)
-            print(f"✅ 样本数据 {sample_file.name}: {len(df)} 条记录")
-            print(f"   时间范围: {df['日期'].min()} 到 {df['日期'].max()}")
+        # 行数取自Parquet元数据，股票数和时间范围只读取symbol/日期两列
+        num_rows = pq.read_metadata(akshare_file).num_rows
+        table = pq.read_table(akshare_file, columns=['symbol', '日期'])
+        date_range = pc.min_max(table.column('日期')).as_py()
+        print(f"✅ akshare股票数量: {pc.count_distinct(table.column('symbol')).as_py()}")
+        print(f"✅ akshare数据 {akshare_file.name}: {num_rows} 条记录")
+        print(f"   时间范围: {date_range['min']} 到 {date_range['max']}")
     
     # 检查tushare数据
-    tushare_data_dir = Path("data") / "tushare_data"
-    if tushare_data_dir.exists():
-        csv_files = list(tushare_data_dir.glob("*.csv"))
-        print(f"✅ tushare数据文件数量: {len(csv_files)}")
+    tushare_file = TUSHARE_DIR / COMBINED_FILE
+    if tushare_file.exists():
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+        
+        symbols = pq.read_table(tushare_file, columns=['symbol']).column('symbol')
+        print(f"✅ tushare股票数量: {pc.count_distinct(symbols).as_py()}")
 
 def create_data_converter():
     """创建数据格式转换脚本"""
@@ -247,57 +403,253 @@ def create_data_converter():
     converter_script = '''#!/usr/bin/env python3
 """
 数据格式转换脚本
-将akshare/tushare数据转换为Qlib格式
+将akshare数据整理为按股票分区的Parquet数据集，供导入Qlib使用
 """
 
-import pandas as pd
+import gc
+import os
+import json
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-import qlib
-from qlib.config import REG_CN
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.dataset as ds
+
+# akshare列名 -> Qlib列名
+COLUMN_MAPPING = {
+    '日期': 'date',
+    '开盘': 'open',
+    '收盘': 'close',
+    '最高': 'high',
+    '最低': 'low',
+    '成交量': 'volume',
+    '成交额': 'amount'
+}
+
+# 转换结果目录，按 symbol=/year= 分区（Hive风格），读取时可按股票和年份裁剪文件
+STAGING_DIR = Path("data/qlib_staging")
+STAGING_PARTITIONING = ds.partitioning(
+    pa.schema([('symbol', pa.string()), ('year', pa.int16())]), flavor="hive"
+)
+
+# 已转换源文件的清单：文件名 -> [mtime_ns, size]，未变化的源文件下次运行时跳过
+# 以下划线开头，读取数据集时会被pyarrow忽略
+MANIFEST_FILE = STAGING_DIR / "_manifest.json"
+
+# 旧版CSV的显式列类型，避免逐列类型推断
+CSV_COLUMN_TYPES = {
+    '日期': pa.timestamp('s'),
+    '开盘': pa.float32(),
+    '收盘': pa.float32(),
+    '最高': pa.float32(),
+    '最低': pa.float32(),
+    '成交量': pa.float64(),
+    '成交额': pa.float64()
+}
+CSV_SCHEMA = pa.schema(list(CSV_COLUMN_TYPES.items()))
+
+# pandas回退路径的分块大小与列类型
+CSV_CHUNK_ROWS = 30_000
+CSV_PANDAS_DTYPES = {
+    '日期': str,
+    '开盘': 'float32',
+    '收盘': 'float32',
+    '最高': 'float32',
+    '最低': 'float32',
+    '成交量': 'float64',
+    '成交额': 'float64'
+}
+
+def read_csv_pandas(csv_file):
+    """列名或格式与Arrow读取不匹配的文件（如英文表头）回退到pandas分块读取"""
+    reverse_mapping = {v: k for k, v in COLUMN_MAPPING.items()}
+    header = pd.read_csv(csv_file, nrows=0).columns
+    rename = {name: reverse_mapping.get(name, name) for name in header
+              if name in CSV_COLUMN_TYPES or name in reverse_mapping}
+    dtype = {name: CSV_PANDAS_DTYPES[target] for name, target in rename.items()}
+    
+    reader = pd.read_csv(csv_file, usecols=list(rename), dtype=dtype, engine='c', chunksize=CSV_CHUNK_ROWS)
+    tables = []
+    date_format = None
+    for chunk in reader:
+        chunk = chunk.rename(columns=rename)
+        dates = chunk['日期']
+        if date_format is None:
+            # 按首个值选定日期格式，走pandas的向量化解析而不是逐个猜格式
+            date_format = '%Y%m%d' if len(dates) and dates.iloc[0].isdigit() else '%Y-%m-%d'
+        chunk['日期'] = pd.to_datetime(dates, format=date_format, cache=True, errors='coerce')
+        tables.append(pa.Table.from_pandas(chunk[list(CSV_COLUMN_TYPES)], schema=CSV_SCHEMA, preserve_index=False))
+    return pa.concat_tables(tables) if tables else CSV_SCHEMA.empty_table()
+
+# 单个文件超过此行数时，恢复GC后立即回收一次
+GC_COLLECT_ROWS = 500_000
+
+@contextlib.contextmanager
+def gc_paused():
+    """批量解析期间暂停循环GC，避免大量临时对象触发反复扫描"""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+def read_one_csv(csv_file):
+    """读取单个旧版CSV（在子进程中运行），返回 (文件名, 表或None, 错误信息)"""
+    name = os.path.basename(csv_file)
+    # 多进程并行时每个进程单线程解析，避免线程数超过核数
+    read_options = pv.ReadOptions(block_size=8 << 20, use_threads=False)
+    convert_options = pv.ConvertOptions(
+        include_columns=list(CSV_COLUMN_TYPES),
+        column_types=CSV_COLUMN_TYPES
+    )
+    try:
+        with gc_paused():
+            try:
+                table = pv.read_csv(csv_file, read_options=read_options, convert_options=convert_options)
+            except (pa.ArrowInvalid, KeyError):
+                table = read_csv_pandas(csv_file)
+            table = table.append_column('symbol', pa.array([name[:-len('.csv')]] * table.num_rows, pa.string()))
+        if table.num_rows > GC_COLLECT_ROWS:
+            gc.collect()
+        return name, table, None
+    except Exception as e:
+        return name, None, str(e)
+
+def file_signature(stat_result):
+    """用修改时间和大小判断源文件是否变化"""
+    return [stat_result.st_mtime_ns, stat_result.st_size]
+
+def load_manifest():
+    """读取转换清单，不存在或损坏时视为空"""
+    try:
+        return json.loads(MANIFEST_FILE.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest):
+    """保存转换清单"""
+    # 先写临时文件再替换，中断时不会留下损坏的清单
+    tmp_file = MANIFEST_FILE.with_name(MANIFEST_FILE.name + ".tmp")
+    tmp_file.write_text(json.dumps(manifest, ensure_ascii=False), encoding='utf-8')
+    os.replace(tmp_file, MANIFEST_FILE)
+
+def read_legacy_csv(akshare_dir, manifest):
+    """读取旧版逐股票CSV，各文件相互独立，用进程池并行解析
+    
+    跳过清单中记录且输出分区仍存在的未变化文件，返回 (表或None, 本次读取成功的文件签名)
+    """
+    # scandir的目录项自带文件类型，无需逐个stat；传给子进程的是可pickle的路径字符串
+    csv_files, signatures, skipped = [], {}, 0
+    with os.scandir(akshare_dir) as entries:
+        for entry in entries:
+            if not (entry.name.endswith('.csv') and entry.is_file()):
+                continue
+            signature = file_signature(entry.stat())
+            symbol_dir = STAGING_DIR / f"symbol={entry.name[:-len('.csv')]}"
+            if manifest.get(entry.name) == signature and symbol_dir.exists():
+                skipped += 1
+                continue
+            csv_files.append(entry.path)
+            signatures[entry.name] = signature
+    csv_files.sort()
+    if skipped:
+        print(f"⏭️ 跳过 {skipped} 个未变化的CSV文件")
+    
+    tables, converted = [], {}
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for name, table, error in executor.map(read_one_csv, csv_files, chunksize=4):
+            if error is not None:
+                print(f"❌ 读取 {name} 失败: {error}")
+            else:
+                tables.append(table)
+                converted[name] = signatures[name]
+    return (pa.concat_tables(tables) if tables else None), converted
 
 def convert_akshare_to_qlib():
     """将akshare数据转换为Qlib格式"""
     print("🔄 转换akshare数据到Qlib格式...")
     
     akshare_dir = Path("data/akshare_data")
-    if not akshare_dir.exists():
-        print("❌ akshare数据目录不存在")
+    source_file = akshare_dir / "cn_daily.parquet"
+    staging_dir = STAGING_DIR
+    
+    manifest = load_manifest()
+    
+    # 只读取需要的列，重命名和计算都在Arrow内完成
+    if source_file.exists():
+        signature = file_signature(source_file.stat())
+        if manifest.get(source_file.name) == signature and staging_dir.exists():
+            print("✅ 源数据未变化，跳过转换")
+            return
+        dataset = ds.dataset(str(source_file), format="parquet")
+        table = dataset.to_table(columns=list(COLUMN_MAPPING) + ['symbol'])
+        converted = {source_file.name: signature}
+    elif akshare_dir.exists():
+        table, converted = read_legacy_csv(akshare_dir, manifest)
+        if table is None:
+            print("⚠️ 没有新增或变化的CSV需要转换")
+            return
+    else:
+        print("❌ akshare数据文件不存在")
         return
     
-    # 初始化Qlib
-    qlib_data_dir = Path.home() / ".qlib" / "qlib_data" / "cn_data"
-    qlib.init(provider_uri=str(qlib_data_dir), region=REG_CN)
-    
-    csv_files = list(akshare_dir.glob("*.csv"))
-    print(f"找到 {len(csv_files)} 个数据文件")
-    
-    for csv_file in csv_files:
-        try:
-            df = pd.read_csv(csv_file)
-            
-            # 重命名列以匹配Qlib格式
-            column_mapping = {
-                '日期': 'date',
-                '开盘': 'open',
-                '收盘': 'close', 
-                '最高': 'high',
-                '最低': 'low',
-                '成交量': 'volume',
-                '成交额': 'amount'
-            }
-            
-            df = df.rename(columns=column_mapping)
-            df['date'] = pd.to_datetime(df['date'])
-            df = df.set_index('date')
-            
-            # 计算vwap
-            if 'amount' in df.columns and 'volume' in df.columns:
-                df['vwap'] = df['amount'] / df['volume']
-            
-            print(f"✅ 转换 {csv_file.name}: {len(df)} 条记录")
-            
-        except Exception as e:
-            print(f"❌ 转换 {csv_file.name} 失败: {str(e)}")
+    table = table.rename_columns([COLUMN_MAPPING.get(name, name) for name in table.column_names])
+    num_symbols = pc.count_distinct(table.column('symbol')).as_py()
+    print(f"找到 {num_symbols} 只股票")
+    
+    if table.num_rows == 0:
+        print("❌ 没有可转换的数据")
+        return
+    
+    # 日期统一为timestamp
+    if not pa.types.is_timestamp(table.schema.field('date').type):
+        date_col = table.column('date')
+        if pa.types.is_string(date_col.type) or pa.types.is_large_string(date_col.type):
+            date_col = pc.strptime(date_col, format='%Y-%m-%d', unit='s')
+        else:
+            date_col = pc.cast(date_col, pa.timestamp('s'))
+        table = table.set_column(table.schema.get_field_index('date'), 'date', date_col)
+    
+    # 计算vwap：直接写入float32结果数组，成交量为0的行记为NaN而不是inf
+    amount = table.column('amount').to_numpy()
+    volume = table.column('volume').to_numpy()
+    vwap = np.full(amount.shape, np.nan, dtype=np.float32)
+    np.divide(amount, volume, out=vwap, where=volume != 0, casting='unsafe')
+    table = table.append_column('vwap', pa.array(vwap))
+    table = table.append_column('year', pc.cast(pc.year(table.column('date')), pa.int16()))
+    
+    ds.write_dataset(
+        table,
+        base_dir=str(staging_dir),
+        format="parquet",
+        partitioning=STAGING_PARTITIONING,
+        existing_data_behavior="overwrite_or_ignore"
+    )
+    
+    manifest.update(converted)
+    save_manifest(manifest)
+    
+    print(f"✅ 转换完成: {num_symbols} 只股票，{table.num_rows} 条记录，保存在 {staging_dir}")
+
+def load_staging(start_date, end_date, symbols=None):
+    """按日期范围（及可选股票列表）读取转换结果，过滤条件下推到分区和行组统计"""
+    dataset = ds.dataset(str(STAGING_DIR), format="parquet", partitioning=STAGING_PARTITIONING)
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    condition = (
+        (ds.field('year') >= start.year) & (ds.field('year') <= end.year)
+        & (ds.field('date') >= pa.scalar(start.to_pydatetime(), pa.timestamp('s')))
+        & (ds.field('date') <= pa.scalar(end.to_pydatetime(), pa.timestamp('s')))
+    )
+    if symbols is not None:
+        condition = condition & ds.field('symbol').isin(list(symbols))
+    return dataset.to_table(filter=condition)
 
 if __name__ == "__main__":
     convert_akshare_to_qlib()
@@ -357,7 +709,7 @@ def main():
         print("✅ 数据格式: 包含OHLCV等必要字段")
         
         print("\n📁 数据位置:")
-        print(f"- Qlib数据: {Path.home() / '.qlib' / 'qlib_data' / 'cn_data'}")
+        print(f"- Qlib数据: {QLIB_CN_DIR}")
         print("- akshare数据: ./data/akshare_data/")
         print("- tushare数据: ./data/tushare_data/")
         
@@ -20,11 +20,15 @@ def install_build_dependencies():
         "cx_Freeze"
     ]
     
-    for dep in dependencies:
-        try:
-            subprocess.run([sys.executable, "-m", "pip", "install", dep], check=True)
+    # 一次pip调用统一解析全部依赖
+    try:
+        subprocess.run([sys.executable, "-m", "pip", "install",
+                        "--upgrade-strategy=only-if-needed", *dependencies],
+                       check=True, timeout=900)
+        for dep in dependencies:
             print(f"   ✅ {dep} 安装成功")
-        except subprocess.CalledProcessError:
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+        for dep in dependencies:
             print(f"   ❌ {dep} 安装失败")
 
 def prepare_build_environment():
@@ -59,6 +63,7 @@ import sys
 import os
 import multiprocessing
 import subprocess
+import socket
 import time
 from pathlib import Path
 
@@ -69,11 +74,22 @@ sys.path.insert(0, str(app_dir / "volumes"))
 
 def check_gpu_support():
     """检查GPU支持"""
+    cached = os.environ.get("KRONOS_GPU_OK")
+    if cached in ("0", "1"):
+        return cached == "1"
     try:
         import torch
         if torch.cuda.is_available():
             gpu_name = torch.cuda.get_device_name(0)
+            os.environ["KRONOS_GPU_NAME"] = gpu_name
             print(f"✅ 检测到GPU: {gpu_name}")
+            # CUDA可用不代表有当前架构的内核（如sm_120），做一次极小矩阵乘法确认，API据此跳过自身的烟雾测试
+            try:
+                torch.zeros((1, 1), device="cuda").matmul(torch.ones((1, 1), device="cuda"))
+                torch.cuda.synchronize()
+            except Exception as e:
+                print(f"⚠️ GPU计算测试失败，使用CPU模式: {e}")
+                return False
             return True
         else:
             print("⚠️ 未检测到GPU，使用CPU模式")
@@ -82,6 +98,17 @@ def check_gpu_support():
         print("❌ PyTorch未安装")
         return False
 
+def wait_port(port, timeout=30):
+    """等待本地端口开始监听"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
 def start_api_service():
     """启动API服务"""
     print("🚀 启动API服务...")
@@ -107,7 +134,7 @@ def start_streamlit_service():
             "app/streamlit_app.py",
             "--server.address", "0.0.0.0",
             "--server.port", "8501"
-        ])
+        ], env=dict(os.environ, CUDA_VISIBLE_DEVICES=""))  # 前端不需要GPU
     except Exception as e:
         print(f"❌ Streamlit服务启动失败: {str(e)}")
 
@@ -125,6 +152,7 @@ def main():
         os.environ["DEVICE"] = "cuda"
     else:
         os.environ["DEVICE"] = "cpu"
+    os.environ["KRONOS_GPU_OK"] = "1" if gpu_available else "0"
     
     print("\\n🌐 服务地址:")
     print("   前端界面: http://localhost:8501")
@@ -136,10 +164,15 @@ def main():
         api_process = multiprocessing.Process(target=start_api_service)
         streamlit_process = multiprocessing.Process(target=start_streamlit_service)
         
+        # 两个服务同时启动，用端口探测代替固定等待
         api_process.start()
-        time.sleep(3)  # 等待API服务启动
         streamlit_process.start()
         
+        if wait_port(8000):
+            print("✅ API服务已就绪")
+        else:
+            print("⚠️ API服务启动超时")
+        
         # 等待进程结束
         api_process.join()
         streamlit_process.join()
@@ -9,6 +9,7 @@ Repository organizer for Kronos project.
 Safe, idempotent, prints a summary of actions.
 """
 from __future__ import annotations
+import errno
 import os
 import re
 import shutil
@@ -18,11 +19,8 @@ ROOT = Path(__file__).resolve().parents[2]
 TESTS_DIR = ROOT / "tests"
 VOLUMES = ROOT / "volumes"
 
-MOVE_TEST_PATTERNS = [
-    re.compile(r"^test_.*\.py$", re.I),
-    re.compile(r"^final_.*\.py$", re.I),
-    re.compile(r"^quick_?test\.py$", re.I),
-]
+MOVE_TEST_RE = re.compile(r"^(?:test_.*|final_.*|quick_?test)\.py$", re.I)
+MODELS_DIR_RE = re.compile(r"models_dir\s*=\s*Path\([\"']models[\"']\)")
 
 EXTERNAL_DIRS = {
     "data": VOLUMES / "data",
@@ -30,10 +28,9 @@ EXTERNAL_DIRS = {
     "models": VOLUMES / "models",
 }
 
-BACKUP_GLOBS = [
-    "**/*.backup",
-    "**/__pycache__/*",  # clean files inside; leave dir if removal fails
-]
+BACKUP_SUFFIX = ".backup"
+CACHE_DIR_NAME = "__pycache__"  # clean files inside; leave dir if removal fails
+SKIP_SCAN_DIRS = {".git"}
 
 IGNORED_ROOT_FILES = {"run.py", "requirements.txt", "docker-compose.yml", "start.sh", "start_docker.ps1", "manage.sh", "manage.bat"}
 
@@ -46,13 +43,14 @@ def ensure_dirs():
 
 def move_root_tests():
     moved = []
-    for p in ROOT.iterdir():
-        if not p.is_file():
-            continue
-        name = p.name
+    with os.scandir(ROOT) as it:
+        entries = [e for e in it if e.is_file(follow_symlinks=False)]
+    for entry in entries:
+        p = Path(entry.path)
+        name = entry.name
         if name in IGNORED_ROOT_FILES:
             continue
-        if any(pat.match(name) for pat in MOVE_TEST_PATTERNS):
+        if MOVE_TEST_RE.match(name):
             dest = TESTS_DIR / name
             if dest.resolve() == p.resolve():
                 continue
@@ -62,40 +60,45 @@ def move_root_tests():
     return moved
 
 
+def _move_file(sp: Path, dp: Path):
+    """Move one file, overwriting dp. Same filesystem is a single rename."""
+    try:
+        os.replace(sp, dp)
+    except PermissionError:
+        # Fallback on Windows when file is locked: copy instead
+        shutil.copyfile(sp, dp)
+        shutil.copystat(sp, dp)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # Cross-device: copyfile uses sendfile/CopyFileEx fast paths
+        shutil.copyfile(sp, dp)
+        shutil.copystat(sp, dp)
+        os.unlink(sp)
+
+
+def _iter_merge_pairs(src: Path, dst: Path):
+    """Yield (src_file, dst_file) pairs, creating destination dirs on the way."""
+    dst.mkdir(parents=True, exist_ok=True)
+    # Materialize the listing before files are moved out of it
+    with os.scandir(src) as it:
+        entries = list(it)
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from _iter_merge_pairs(Path(entry.path), dst / entry.name)
+        else:
+            yield Path(entry.path), dst / entry.name
+
+
 def merge_dir(src: Path, dst: Path, include=None):
     if not src.exists():
         return []
     moved = []
-    for root, dirs, files in os.walk(src):
-        rel = Path(root).relative_to(src)
-        (dst / rel).mkdir(parents=True, exist_ok=True)
-        for f in files:
-            sp = Path(root) / f
-            if include and not include(sp):
-                continue
-            dp = dst / rel / f
-            if dp.exists():
-                # Overwrite existing
-                try:
-                    shutil.copy2(sp, dp)
-                except Exception:
-                    shutil.copy(sp, dp)
-            else:
-                try:
-                    shutil.move(str(sp), str(dp))
-                except PermissionError:
-                    # Fallback on Windows when file is locked: copy instead
-                    try:
-                        shutil.copy2(sp, dp)
-                    except Exception:
-                        shutil.copy(sp, dp)
-                except Exception:
-                    # As a last resort, try copy
-                    try:
-                        shutil.copy2(sp, dp)
-                    except Exception:
-                        shutil.copy(sp, dp)
-            moved.append((sp, dp))
+    for sp, dp in _iter_merge_pairs(src, dst):
+        if include and not include(sp):
+            continue
+        _move_file(sp, dp)
+        moved.append((sp, dp))
     # Try to remove empty source tree (ignore if locked files remain)
     try:
         shutil.rmtree(src)
@@ -120,7 +123,7 @@ def update_tests_references():
     changed = False
     if tm.exists():
         txt = tm.read_text(encoding="utf-8")
-        new = re.sub(r"models_dir\s*=\s*Path\([\"']models[\"']\)", "models_dir = Path('volumes/models')", txt)
+        new = MODELS_DIR_RE.sub("models_dir = Path('volumes/models')", txt)
         if new != txt:
             tm.write_text(new, encoding="utf-8")
             changed = True
@@ -128,6 +131,21 @@ def update_tests_references():
     return changed
 
 
+def _iter_backup_files(root: Path, in_cache: bool = False):
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            if entry.name not in SKIP_SCAN_DIRS:
+                yield from _iter_backup_files(Path(entry.path), entry.name == CACHE_DIR_NAME)
+        elif entry.is_file(follow_symlinks=False):
+            if in_cache or entry.name.endswith(BACKUP_SUFFIX):
+                yield Path(entry.path)
+
+
 def remove_backups():
     removed = []
     # explicit known backups
@@ -136,15 +154,13 @@ def remove_backups():
             print(f"[CLEAN] Remove {p}")
             p.unlink(missing_ok=True)
             removed.append(p)
-    # generic globs
-    for pat in BACKUP_GLOBS:
-        for p in ROOT.glob(pat):
-            try:
-                if p.is_file():
-                    p.unlink(missing_ok=True)
-                    removed.append(p)
-            except Exception:
-                pass
+    # generic: *.backup files and files inside __pycache__, in one traversal
+    for p in _iter_backup_files(ROOT):
+        try:
+            p.unlink(missing_ok=True)
+            removed.append(p)
+        except Exception:
+            pass
     return removed
 
 
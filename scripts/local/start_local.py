@@ -6,6 +6,7 @@ RTX 5090 GPU加速股票预测系统 - 本地启动脚本
 import os
 import sys
 import time
+import socket
 import subprocess
 import multiprocessing
 from pathlib import Path
@@ -48,12 +49,19 @@ def check_gpu():
     """检查GPU状态"""
     print("\n🚀 检查GPU状态...")
     
+    # 已有检测结果（由上层启动进程写入环境变量）时不再导入torch初始化CUDA
+    cached = os.environ.get("KRONOS_GPU_OK")
+    if cached in ("0", "1"):
+        print(f"✅ 复用GPU检测结果: {os.environ.get('KRONOS_GPU_NAME') or 'CPU'}")
+        return cached == "1"
+    
     try:
         import torch
         print(f"PyTorch版本: {torch.__version__}")
         
         if torch.cuda.is_available():
             gpu_name = torch.cuda.get_device_name(0)
+            os.environ["KRONOS_GPU_NAME"] = gpu_name
             gpu_memory = torch.cuda.get_device_properties(0).total_memory / 1024**3
             print(f"✅ GPU: {gpu_name}")
             print(f"✅ 显存: {gpu_memory:.1f} GB")
@@ -94,6 +102,11 @@ def setup_environment():
         "AUTO_DOWNLOAD_DATA": "true"
     }
     
+    # API服务的预测输入长度不固定，可扩展显存段可减少显存碎片（Windows不支持expandable_segments）
+    alloc_conf = ("" if sys.platform == "win32" else "expandable_segments:True,") \
+        + "max_split_size_mb:128,garbage_collection_threshold:0.8"
+    env_vars["PYTORCH_CUDA_ALLOC_CONF"] = os.environ.get("PYTORCH_CUDA_ALLOC_CONF", alloc_conf)
+    
     for key, value in env_vars.items():
         os.environ[key] = value
         print(f"   {key}={value}")
@@ -129,49 +142,70 @@ def start_streamlit_service():
         base_dir = Path(__file__).parent.parent.parent
         os.chdir(base_dir)
         
-        # 启动streamlit
+        # 启动streamlit（前端不需要GPU，屏蔽CUDA避免意外初始化）
         subprocess.run([
             sys.executable, "-m", "streamlit", "run",
             "app/streamlit_app.py",
             "--server.address", "0.0.0.0",
             "--server.port", "8501"
-        ])
+        ], env=dict(os.environ, CUDA_VISIBLE_DEVICES=""))
     except KeyboardInterrupt:
         print("Streamlit服务已停止")
     except Exception as e:
         print(f"❌ Streamlit服务启动失败: {str(e)}")
 
+def wait_port(port, timeout=30):
+    """等待本地端口开始监听"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
 def wait_for_services():
     """等待服务启动"""
     print("⏳ 等待服务启动...")
     
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    # 复用同一会话的长连接，探测失败由外层循环重试
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=2,
+                                         max_retries=Retry(total=0, connect=0, read=0, backoff_factor=0)))
+    
+    def probe(url, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                response = session.get(url, timeout=(0.2, 2))
+                if response.status_code == 200:
+                    return True
+            except requests.RequestException:
+                pass
+            time.sleep(0.1)
+        return False
+    
+    # 先用TCP探测端口，服务一旦监听即进入健康检查
+    wait_port(8000)
     
     # 等待API服务
-    for i in range(30):
-        try:
-            response = requests.get("http://localhost:8000/health", timeout=1)
-            if response.status_code == 200:
-                print("✅ API服务已启动")
-                break
-        except:
-            pass
-        time.sleep(1)
+    if probe("http://localhost:8000/health"):
+        print("✅ API服务已启动")
     else:
         print("⚠️ API服务启动超时")
     
     # 等待Streamlit服务
-    for i in range(30):
-        try:
-            response = requests.get("http://localhost:8501", timeout=1)
-            if response.status_code == 200:
-                print("✅ Streamlit服务已启动")
-                break
-        except:
-            pass
-        time.sleep(1)
+    if probe("http://localhost:8501"):
+        print("✅ Streamlit服务已启动")
     else:
         print("⚠️ Streamlit服务启动超时")
+    
+    session.close()
 
 def main():
     """主函数"""
@@ -189,6 +223,8 @@ def main():
         os.environ["DEVICE"] = "cuda"
     else:
         os.environ["DEVICE"] = "cpu"
+    # 检测结果随环境变量传给子进程，API启动时跳过重复的GPU烟雾测试
+    os.environ["KRONOS_GPU_OK"] = "1" if gpu_available else "0"
     
     # 3. 设置环境
     setup_environment()
@@ -201,11 +237,15 @@ def main():
     
     try:
         # 4. 启动服务
-        api_process = multiprocessing.Process(target=start_api_service)
-        streamlit_process = multiprocessing.Process(target=start_streamlit_service)
+        # check_gpu已在父进程初始化CUDA，Linux上用forkserver避免fork继承CUDA状态；
+        # 其他平台本就是spawn，子进程只导入本脚本的轻量模块
+        start_method = "forkserver" if sys.platform.startswith("linux") else "spawn"
+        ctx = multiprocessing.get_context(start_method)
+        api_process = ctx.Process(target=start_api_service)
+        streamlit_process = ctx.Process(target=start_streamlit_service)
         
+        # 两个服务同时启动，前端请求API时自行处理未就绪的情况
         api_process.start()
-        time.sleep(3)  # 等待API服务启动
         streamlit_process.start()
         
         # 5. 等待服务就绪
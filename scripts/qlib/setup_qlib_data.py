@@ -5,50 +5,61 @@ Qlib数据自动化准备脚本
 
 import os
 import sys
+from importlib.metadata import distribution, PackageNotFoundError
+import shlex
+import threading
 import subprocess
 import shutil
 from pathlib import Path
-import requests
-import zipfile
-import tempfile
 
-def run_command(cmd, description=""):
-    """运行命令并处理错误"""
+def run_command(cmd, description="", timeout=3600):
+    """运行命令并处理错误（逐行转发子进程输出，不在内存中缓存）"""
     print(f"🔄 {description}")
     print(f"执行命令: {cmd}")
     
     try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=3600)
-        if result.returncode == 0:
-            print(f"✅ {description} 成功")
-            if result.stdout:
-                print(f"输出: {result.stdout}")
-            return True
-        else:
-            print(f"❌ {description} 失败")
-            print(f"错误: {result.stderr}")
-            return False
-    except subprocess.TimeoutExpired:
-        print(f"⏰ {description} 超时")
-        return False
+        proc = subprocess.Popen(shlex.split(cmd), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                text=True, bufsize=1)
     except Exception as e:
         print(f"❌ {description} 异常: {str(e)}")
         return False
+    
+    # 输出读到EOF前会一直阻塞，超时由定时器结束子进程
+    timer = threading.Timer(timeout, proc.kill)
+    timer.start()
+    try:
+        for line in proc.stdout:
+            print(line, end='')
+        proc.wait()
+    finally:
+        timed_out = not timer.is_alive()
+        timer.cancel()
+        proc.stdout.close()
+    
+    if timed_out:
+        print(f"⏰ {description} 超时")
+        return False
+    if proc.returncode == 0:
+        print(f"✅ {description} 成功")
+        return True
+    print(f"❌ {description} 失败 (退出码 {proc.returncode})")
+    return False
 
 def check_python_packages():
     """检查Python包依赖"""
     print("\n📦 检查Python包依赖...")
     
     required_packages = [
-        'numpy', 'pandas', 'torch', 'requests'
+        'numpy', 'pandas', 'torch'
     ]
     
+    # 只读取已安装发行包的元数据，不导入模块，避免触发torch的CUDA初始化等开销
     missing_packages = []
     for package in required_packages:
         try:
-            __import__(package)
+            distribution(package)
             print(f"✅ {package} 已安装")
-        except ImportError:
+        except PackageNotFoundError:
             print(f"❌ {package} 未安装")
             missing_packages.append(package)
     
@@ -127,9 +138,11 @@ def verify_qlib_data():
         from qlib.config import REG_CN
         from qlib.data import D
         
-        # 初始化Qlib
+        # 初始化Qlib（启用磁盘表达式/数据集缓存，重复验证时直接读取缓存；
+        # 缓存依赖的redis不可用时Qlib会自动关闭缓存）
         data_path = str(Path.cwd() / "volumes" / "qlib_data" / "cn_data")
-        qlib.init(provider_uri=data_path, region=REG_CN)
+        qlib.init(provider_uri=data_path, region=REG_CN,
+                  expression_cache="DiskExpressionCache", dataset_cache="DiskDatasetCache")
         
         # 测试数据访问
         instruments = D.instruments('csi300')
@@ -139,7 +152,7 @@ def verify_qlib_data():
             # 测试获取单只股票数据
             sample_stock = instruments[0]
             data = D.features([sample_stock], ['$close', '$volume'], 
-                            start_time='2023-01-01', end_time='2023-12-31')
+                            start_time='2023-01-01', end_time='2023-12-31', disk_cache=1)
             print(f"✅ 样本股票 {sample_stock} 数据形状: {data.shape}")
             
             if len(data) > 0:
@@ -198,9 +211,10 @@ def test_qlib_data():
     print("🔍 测试Qlib数据访问...")
     
     try:
-        # 初始化Qlib
+        # 初始化Qlib（启用磁盘表达式/数据集缓存）
         data_path = str(Path.cwd() / "volumes" / "qlib_data" / "cn_data")
-        qlib.init(provider_uri=data_path, region=REG_CN)
+        qlib.init(provider_uri=data_path, region=REG_CN,
+                  expression_cache="DiskExpressionCache", dataset_cache="DiskDatasetCache")
         print(f"✅ Qlib初始化成功: {data_path}")
         
         # 获取股票列表
@@ -216,7 +230,7 @@ def test_qlib_data():
             fields = ['$open', '$high', '$low', '$close', '$volume']
             
             data = D.features(sample_stocks, fields, 
-                            start_time='2023-01-01', end_time='2023-12-31')
+                            start_time='2023-01-01', end_time='2023-12-31', disk_cache=1)
             
             print(f"✅ 数据获取成功")
             print(f"数据形状: {data.shape}")
@@ -1,57 +1,253 @@
 #!/usr/bin/env python3
 """
 数据格式转换脚本
-将akshare/tushare数据转换为Qlib格式
+将akshare数据整理为按股票分区的Parquet数据集，供导入Qlib使用
 """
 
-import pandas as pd
+import gc
+import os
+import json
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-import qlib
-from qlib.config import REG_CN
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.dataset as ds
+
+# akshare列名 -> Qlib列名
+COLUMN_MAPPING = {
+    '日期': 'date',
+    '开盘': 'open',
+    '收盘': 'close',
+    '最高': 'high',
+    '最低': 'low',
+    '成交量': 'volume',
+    '成交额': 'amount'
+}
+
+# 转换结果目录，按 symbol=/year= 分区（Hive风格），读取时可按股票和年份裁剪文件
+STAGING_DIR = Path("data/qlib_staging")
+STAGING_PARTITIONING = ds.partitioning(
+    pa.schema([('symbol', pa.string()), ('year', pa.int16())]), flavor="hive"
+)
+
+# 已转换源文件的清单：文件名 -> [mtime_ns, size]，未变化的源文件下次运行时跳过
+# 以下划线开头，读取数据集时会被pyarrow忽略
+MANIFEST_FILE = STAGING_DIR / "_manifest.json"
+
+# 旧版CSV的显式列类型，避免逐列类型推断
+CSV_COLUMN_TYPES = {
+    '日期': pa.timestamp('s'),
+    '开盘': pa.float32(),
+    '收盘': pa.float32(),
+    '最高': pa.float32(),
+    '最低': pa.float32(),
+    '成交量': pa.float64(),
+    '成交额': pa.float64()
+}
+CSV_SCHEMA = pa.schema(list(CSV_COLUMN_TYPES.items()))
+
+# pandas回退路径的分块大小与列类型
+CSV_CHUNK_ROWS = 30_000
+CSV_PANDAS_DTYPES = {
+    '日期': str,
+    '开盘': 'float32',
+    '收盘': 'float32',
+    '最高': 'float32',
+    '最低': 'float32',
+    '成交量': 'float64',
+    '成交额': 'float64'
+}
+
+def read_csv_pandas(csv_file):
+    """列名或格式与Arrow读取不匹配的文件（如英文表头）回退到pandas分块读取"""
+    reverse_mapping = {v: k for k, v in COLUMN_MAPPING.items()}
+    header = pd.read_csv(csv_file, nrows=0).columns
+    rename = {name: reverse_mapping.get(name, name) for name in header
+              if name in CSV_COLUMN_TYPES or name in reverse_mapping}
+    dtype = {name: CSV_PANDAS_DTYPES[target] for name, target in rename.items()}
+    
+    reader = pd.read_csv(csv_file, usecols=list(rename), dtype=dtype, engine='c', chunksize=CSV_CHUNK_ROWS)
+    tables = []
+    date_format = None
+    for chunk in reader:
+        chunk = chunk.rename(columns=rename)
+        dates = chunk['日期']
+        if date_format is None:
+            # 按首个值选定日期格式，走pandas的向量化解析而不是逐个猜格式
+            date_format = '%Y%m%d' if len(dates) and dates.iloc[0].isdigit() else '%Y-%m-%d'
+        chunk['日期'] = pd.to_datetime(dates, format=date_format, cache=True, errors='coerce')
+        tables.append(pa.Table.from_pandas(chunk[list(CSV_COLUMN_TYPES)], schema=CSV_SCHEMA, preserve_index=False))
+    return pa.concat_tables(tables) if tables else CSV_SCHEMA.empty_table()
+
+# 单个文件超过此行数时，恢复GC后立即回收一次
+GC_COLLECT_ROWS = 500_000
+
+@contextlib.contextmanager
+def gc_paused():
+    """批量解析期间暂停循环GC，避免大量临时对象触发反复扫描"""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+def read_one_csv(csv_file):
+    """读取单个旧版CSV（在子进程中运行），返回 (文件名, 表或None, 错误信息)"""
+    name = os.path.basename(csv_file)
+    # 多进程并行时每个进程单线程解析，避免线程数超过核数
+    read_options = pv.ReadOptions(block_size=8 << 20, use_threads=False)
+    convert_options = pv.ConvertOptions(
+        include_columns=list(CSV_COLUMN_TYPES),
+        column_types=CSV_COLUMN_TYPES
+    )
+    try:
+        with gc_paused():
+            try:
+                table = pv.read_csv(csv_file, read_options=read_options, convert_options=convert_options)
+            except (pa.ArrowInvalid, KeyError):
+                table = read_csv_pandas(csv_file)
+            table = table.append_column('symbol', pa.array([name[:-len('.csv')]] * table.num_rows, pa.string()))
+        if table.num_rows > GC_COLLECT_ROWS:
+            gc.collect()
+        return name, table, None
+    except Exception as e:
+        return name, None, str(e)
+
+def file_signature(stat_result):
+    """用修改时间和大小判断源文件是否变化"""
+    return [stat_result.st_mtime_ns, stat_result.st_size]
+
+def load_manifest():
+    """读取转换清单，不存在或损坏时视为空"""
+    try:
+        return json.loads(MANIFEST_FILE.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest):
+    """保存转换清单"""
+    # 先写临时文件再替换，中断时不会留下损坏的清单
+    tmp_file = MANIFEST_FILE.with_name(MANIFEST_FILE.name + ".tmp")
+    tmp_file.write_text(json.dumps(manifest, ensure_ascii=False), encoding='utf-8')
+    os.replace(tmp_file, MANIFEST_FILE)
+
+def read_legacy_csv(akshare_dir, manifest):
+    """读取旧版逐股票CSV，各文件相互独立，用进程池并行解析
+    
+    跳过清单中记录且输出分区仍存在的未变化文件，返回 (表或None, 本次读取成功的文件签名)
+    """
+    # scandir的目录项自带文件类型，无需逐个stat；传给子进程的是可pickle的路径字符串
+    csv_files, signatures, skipped = [], {}, 0
+    with os.scandir(akshare_dir) as entries:
+        for entry in entries:
+            if not (entry.name.endswith('.csv') and entry.is_file()):
+                continue
+            signature = file_signature(entry.stat())
+            symbol_dir = STAGING_DIR / f"symbol={entry.name[:-len('.csv')]}"
+            if manifest.get(entry.name) == signature and symbol_dir.exists():
+                skipped += 1
+                continue
+            csv_files.append(entry.path)
+            signatures[entry.name] = signature
+    csv_files.sort()
+    if skipped:
+        print(f"⏭️ 跳过 {skipped} 个未变化的CSV文件")
+    
+    tables, converted = [], {}
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for name, table, error in executor.map(read_one_csv, csv_files, chunksize=4):
+            if error is not None:
+                print(f"❌ 读取 {name} 失败: {error}")
+            else:
+                tables.append(table)
+                converted[name] = signatures[name]
+    return (pa.concat_tables(tables) if tables else None), converted
 
 def convert_akshare_to_qlib():
     """将akshare数据转换为Qlib格式"""
     print("🔄 转换akshare数据到Qlib格式...")
     
     akshare_dir = Path("data/akshare_data")
-    if not akshare_dir.exists():
-        print("❌ akshare数据目录不存在")
+    source_file = akshare_dir / "cn_daily.parquet"
+    staging_dir = STAGING_DIR
+    
+    manifest = load_manifest()
+    
+    # 只读取需要的列，重命名和计算都在Arrow内完成
+    if source_file.exists():
+        signature = file_signature(source_file.stat())
+        if manifest.get(source_file.name) == signature and staging_dir.exists():
+            print("✅ 源数据未变化，跳过转换")
+            return
+        dataset = ds.dataset(str(source_file), format="parquet")
+        table = dataset.to_table(columns=list(COLUMN_MAPPING) + ['symbol'])
+        converted = {source_file.name: signature}
+    elif akshare_dir.exists():
+        table, converted = read_legacy_csv(akshare_dir, manifest)
+        if table is None:
+            print("⚠️ 没有新增或变化的CSV需要转换")
+            return
+    else:
+        print("❌ akshare数据文件不存在")
+        return
+    
+    table = table.rename_columns([COLUMN_MAPPING.get(name, name) for name in table.column_names])
+    num_symbols = pc.count_distinct(table.column('symbol')).as_py()
+    print(f"找到 {num_symbols} 只股票")
+    
+    if table.num_rows == 0:
+        print("❌ 没有可转换的数据")
         return
     
-    # 初始化Qlib
-    qlib_data_dir = Path.home() / ".qlib" / "qlib_data" / "cn_data"
-    qlib.init(provider_uri=str(qlib_data_dir), region=REG_CN)
-    
-    csv_files = list(akshare_dir.glob("*.csv"))
-    print(f"找到 {len(csv_files)} 个数据文件")
-    
-    for csv_file in csv_files:
-        try:
-            df = pd.read_csv(csv_file)
-            
-            # 重命名列以匹配Qlib格式
-            column_mapping = {
-                '日期': 'date',
-                '开盘': 'open',
-                '收盘': 'close', 
-                '最高': 'high',
-                '最低': 'low',
-                '成交量': 'volume',
-                '成交额': 'amount'
-            }
-            
-            df = df.rename(columns=column_mapping)
-            df['date'] = pd.to_datetime(df['date'])
-            df = df.set_index('date')
-            
-            # 计算vwap
-            if 'amount' in df.columns and 'volume' in df.columns:
-                df['vwap'] = df['amount'] / df['volume']
-            
-            print(f"✅ 转换 {csv_file.name}: {len(df)} 条记录")
-            
-        except Exception as e:
-            print(f"❌ 转换 {csv_file.name} 失败: {str(e)}")
+    # 日期统一为timestamp
+    if not pa.types.is_timestamp(table.schema.field('date').type):
+        date_col = table.column('date')
+        if pa.types.is_string(date_col.type) or pa.types.is_large_string(date_col.type):
+            date_col = pc.strptime(date_col, format='%Y-%m-%d', unit='s')
+        else:
+            date_col = pc.cast(date_col, pa.timestamp('s'))
+        table = table.set_column(table.schema.get_field_index('date'), 'date', date_col)
+    
+    # 计算vwap：直接写入float32结果数组，成交量为0的行记为NaN而不是inf
+    amount = table.column('amount').to_numpy()
+    volume = table.column('volume').to_numpy()
+    vwap = np.full(amount.shape, np.nan, dtype=np.float32)
+    np.divide(amount, volume, out=vwap, where=volume != 0, casting='unsafe')
+    table = table.append_column('vwap', pa.array(vwap))
+    table = table.append_column('year', pc.cast(pc.year(table.column('date')), pa.int16()))
+    
+    ds.write_dataset(
+        table,
+        base_dir=str(staging_dir),
+        format="parquet",
+        partitioning=STAGING_PARTITIONING,
+        existing_data_behavior="overwrite_or_ignore"
+    )
+    
+    manifest.update(converted)
+    save_manifest(manifest)
+    
+    print(f"✅ 转换完成: {num_symbols} 只股票，{table.num_rows} 条记录，保存在 {staging_dir}")
+
+def load_staging(start_date, end_date, symbols=None):
+    """按日期范围（及可选股票列表）读取转换结果，过滤条件下推到分区和行组统计"""
+    dataset = ds.dataset(str(STAGING_DIR), format="parquet", partitioning=STAGING_PARTITIONING)
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    condition = (
+        (ds.field('year') >= start.year) & (ds.field('year') <= end.year)
+        & (ds.field('date') >= pa.scalar(start.to_pydatetime(), pa.timestamp('s')))
+        & (ds.field('date') <= pa.scalar(end.to_pydatetime(), pa.timestamp('s')))
+    )
+    if symbols is not None:
+        condition = condition & ds.field('symbol').isin(list(symbols))
+    return dataset.to_table(filter=condition)
 
 if __name__ == "__main__":
     convert_akshare_to_qlib()
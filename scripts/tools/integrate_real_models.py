@@ -21,15 +21,21 @@ akshare数据适配器 - 将akshare数据转换为Kronos格式
 
 import pandas as pd
 import numpy as np
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Tuple, Optional
 
+# 下载脚本把所有股票追加写入同一个Parquet文件，symbol列为股票代码
+COMBINED_FILE = "cn_daily.parquet"
+
 class AkshareDataAdapter:
     """akshare数据适配器"""
     
     def __init__(self, data_dir: str = "data/akshare_data"):
         self.data_dir = Path(data_dir)
+        self.data_file = self.data_dir / COMBINED_FILE
         
     def get_stock_data(self, stock_code: str, lookback: int = 100) -> Optional[pd.DataFrame]:
         """
@@ -43,15 +49,16 @@ class AkshareDataAdapter:
             DataFrame with columns: [open, high, low, close, volume, amount]
         """
         # 查找数据文件
-        csv_file = self.data_dir / f"{stock_code}.csv"
-        
-        if not csv_file.exists():
-            print(f"❌ 股票数据文件不存在: {csv_file}")
+        if not self.data_file.exists():
+            print(f"❌ 股票数据文件不存在: {self.data_file}")
             return None
         
         try:
-            # 读取数据
-            df = pd.read_csv(csv_file)
+            # 只读取该股票的行（按symbol列下推过滤）
+            df = pd.read_parquet(self.data_file, filters=[('symbol', '=', stock_code)])
+            if len(df) == 0:
+                print(f"❌ 没有股票 {stock_code} 的数据")
+                return None
             
             # 重命名列以匹配Kronos格式
             column_mapping = {
@@ -68,8 +75,14 @@ class AkshareDataAdapter:
             
             # 确保数据类型正确
             df['date'] = pd.to_datetime(df['date'])
-            for col in ['open', 'high', 'low', 'close', 'volume', 'amount']:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+            df = df.astype({
+                'open': 'float32',
+                'high': 'float32',
+                'low': 'float32',
+                'close': 'float32',
+                'volume': 'int64',
+                'amount': 'float64'
+            })
             
             # 按日期排序
             df = df.sort_values('date')
@@ -141,11 +154,12 @@ class AkshareDataAdapter:
     
     def list_available_stocks(self) -> list:
         """列出可用的股票代码"""
-        if not self.data_dir.exists():
+        if not self.data_file.exists():
             return []
         
-        csv_files = list(self.data_dir.glob("*.csv"))
-        stock_codes = [f.stem for f in csv_files]
+        # 只读取symbol一列
+        symbols = pq.read_table(self.data_file, columns=['symbol']).column('symbol')
+        stock_codes = pc.unique(symbols).to_pylist()
         
         return sorted(stock_codes)
 '''
@@ -398,19 +412,26 @@ if __name__ == "__main__":
     
     print(f"✅ 测试脚本已创建: {test_file}")
     
-    # 运行测试
+    # 运行测试（在当前进程内加载并执行，避免再启动一个Python解释器）
     try:
-        import subprocess
-        result = subprocess.run([sys.executable, str(test_file)], 
-                              capture_output=True, text=True, timeout=30)
-        
-        if result.returncode == 0:
+        import io
+        import importlib.util
+        from contextlib import redirect_stdout
+        
+        spec = importlib.util.spec_from_file_location("test_integration", test_file)
+        module = importlib.util.module_from_spec(spec)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            spec.loader.exec_module(module)
+            passed = module.test_data_adapter()
+        
+        if passed:
             print("✅ 集成测试通过")
-            print(result.stdout)
+            print(output.getvalue())
             return True
         else:
             print("❌ 集成测试失败")
-            print(result.stderr)
+            print(output.getvalue())
             return False
             
     except Exception as e:
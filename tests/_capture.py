@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+测试脚本共用的并行输出捕获
+并行执行检查时，每个工作线程的输出先写入各自的缓冲区，由主线程按原顺序整体输出，避免输出交错
+"""
+
+import io
+import sys
+import threading
+import contextlib
+
+_thread_output = threading.local()
+
+
+class _ThreadLocalStdout:
+    """按线程分流的stdout：设置了缓冲区的线程写入缓冲区，其余线程写入原始输出"""
+    
+    def __init__(self, stream):
+        self._stream = stream
+    
+    def write(self, text):
+        return getattr(_thread_output, 'buffer', self._stream).write(text)
+    
+    def flush(self):
+        getattr(_thread_output, 'buffer', self._stream).flush()
+    
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+@contextlib.contextmanager
+def thread_local_stdout():
+    """with块内把sys.stdout替换为按线程分流的代理，退出时恢复"""
+    real_stdout = sys.stdout
+    sys.stdout = _ThreadLocalStdout(real_stdout)
+    try:
+        yield
+    finally:
+        sys.stdout = real_stdout
+
+
+def run_captured(test_func):
+    """在工作线程中运行一项检查，返回 (是否通过, 异常, 输出文本)"""
+    _thread_output.buffer = io.StringIO()
+    try:
+        try:
+            return bool(test_func()), None, _thread_output.buffer.getvalue()
+        except Exception as e:
+            return False, e, _thread_output.buffer.getvalue()
+    finally:
+        del _thread_output.buffer
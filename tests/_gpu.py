@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+测试脚本共用的GPU检查
+同一进程内只做一次GPU计算测试，多个检查共享结果，避免重复初始化CUDA上下文和cuBLAS
+导入本模块时会配置CUDA显存分配器，需在 import torch 之前导入
+"""
+
+import os
+import sys
+import functools
+
+# 可扩展显存段减少不同输入长度造成的碎片（Windows不支持expandable_segments），用户已设置时不覆盖
+os.environ.setdefault(
+    "PYTORCH_CUDA_ALLOC_CONF",
+    ("" if sys.platform == "win32" else "expandable_segments:True,")
+    + "max_split_size_mb:128,garbage_collection_threshold:0.8"
+)
+
+
+@functools.lru_cache(maxsize=1)
+def warmup_cuda():
+    """在GPU上执行一次小矩阵乘法，返回 (是否成功, 错误信息)
+
+    只需验证内核能否在当前GPU架构上启动（如RTX 5090的sm_120），矩阵大小不影响结论
+    """
+    try:
+        import torch
+        # 矩阵乘法使用TF32（Ampere及以上GPU），精度损失可忽略，按GPU的快速精度模式验证
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
+        torch.backends.cudnn.benchmark = True
+        torch.set_float32_matmul_precision("high")
+
+        device = torch.device("cuda:0")
+        # 常数矩阵即可，不需要randn初始化随机数生成器状态
+        x = torch.ones((64, 64), device=device)
+        z = x @ x
+        torch.cuda.synchronize(device)
+
+        # 只释放张量，显存块留在PyTorch缓存分配器中供后续计算复用；
+        # empty_cache 会把缓存还给驱动，之后的分配需重新cudaMalloc并同步
+        del x, z
+        return True, None
+    except Exception as e:
+        return False, str(e)
+
+
+@functools.lru_cache(maxsize=1)
+def gpu_properties():
+    """GPU属性快照（只向驱动查询一次），GPU不可用时返回None"""
+    import torch
+    return torch.cuda.get_device_properties(0) if torch.cuda.is_available() else None
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+测试脚本共用的HTTP会话
+所有请求复用同一个连接池，避免每次调用都重新建立TCP连接
+服务刚重启时的连接失败和502/503/504会快速重试两次
+"""
+
+import re
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+SESSION = requests.Session()
+_retry = Retry(
+    total=2,
+    backoff_factor=0.1,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=frozenset(['GET', 'POST']),
+    raise_on_status=False
+)
+_adapter = HTTPAdapter(max_retries=_retry, pool_connections=10, pool_maxsize=20)
+SESSION.mount('http://', _adapter)
+SESSION.mount('https://', _adapter)
+SESSION.headers['Connection'] = 'keep-alive'
+
+
+def scan_page(url, keywords, timeout=5):
+    """流式读取页面，返回(状态码, 找到的关键词集合)，关键词全部找到后立即停止下载"""
+    # 在原始字节上匹配，避免服务端未声明charset时中文解码出错
+    encoded = [keyword.encode('utf-8') for keyword in keywords]
+    pattern = re.compile(b'|'.join(re.escape(keyword) for keyword in encoded))
+    overlap = max(len(keyword) for keyword in encoded) - 1
+    found = set()
+    with SESSION.get(url, stream=True, timeout=timeout) as response:
+        if response.status_code != 200:
+            return response.status_code, found
+        tail = b''
+        for chunk in response.iter_content(chunk_size=65536):
+            # 拼上一块的末尾，防止关键词跨块被截断
+            window = tail + chunk
+            found.update(match.group(0).decode('utf-8') for match in pattern.finditer(window))
+            if len(found) == len(encoded):
+                break
+            tail = window[-overlap:]
+    return response.status_code, found
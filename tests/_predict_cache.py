@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+测试脚本共用的预测响应缓存
+相同请求参数在有效期内直接复用上次成功的 /predict 响应
+进程内先查内存字典，未命中再查磁盘缓存；排查问题的脚本用 disk=False 只复用本进程内的响应
+设置环境变量 TEST_NOCACHE=1 可跳过缓存做真实的端到端检查
+测试脚本统一通过 cached_predict 调用 /predict
+"""
+
+import os
+import json
+import time
+import hashlib
+from pathlib import Path
+
+# 预测响应体较大（数千条历史数据），优先用orjson解析，未安装时回退到标准库json
+try:
+    import orjson
+    from orjson import loads
+
+    def dumps_pretty(obj):
+        """缩进2格的JSON文本，中文原样输出"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+except ImportError:
+    from json import loads
+
+    def dumps_pretty(obj):
+        """缩进2格的JSON文本，中文原样输出"""
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+
+PREDICT_URL = "http://localhost:8000/predict"
+CACHE_DIR = Path(__file__).resolve().parent / ".predict_cache"
+TTL_SECONDS = 3600
+
+# 进程内缓存：key -> (过期时间(monotonic), 响应数据)
+_MEMORY = {}
+
+
+def _cache_key(payload, url):
+    # 地址也计入键，API_BASE_URL 指向其他服务时不会复用本地服务的响应
+    raw = json.dumps([url, payload], sort_keys=True)
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def _cache_file(key):
+    return CACHE_DIR / f"{key}.json"
+
+
+def load(payload, url=PREDICT_URL, disk=True):
+    """返回缓存的响应数据，没有或已过期时返回None；disk=False 时只查进程内缓存"""
+    if os.getenv('TEST_NOCACHE', '0') == '1':
+        return None
+    key = _cache_key(payload, url)
+    entry = _MEMORY.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+    if not disk:
+        return None
+    cache_file = _cache_file(key)
+    try:
+        age = time.time() - cache_file.stat().st_mtime
+        if age < TTL_SECONDS:
+            data = loads(cache_file.read_bytes())
+            _MEMORY[key] = (time.monotonic() + TTL_SECONDS - age, data)
+            return data
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def store(payload, data, url=PREDICT_URL, disk=True):
+    """只缓存成功的预测结果；disk=False 时不写磁盘"""
+    if os.getenv('TEST_NOCACHE', '0') == '1' or not data.get('success'):
+        return
+    key = _cache_key(payload, url)
+    _MEMORY[key] = (time.monotonic() + TTL_SECONDS, data)
+    if not disk:
+        return
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _cache_file(key).write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    except OSError:
+        pass
+
+
+def cached_predict(payload, url=PREDICT_URL, timeout=30, indent="", verbose=True, disk=True):
+    """带缓存的 /predict 调用，返回 (状态码, 响应数据, 响应对象)
+
+    命中缓存时状态码为200、响应对象为None；非200时响应数据为None，错误内容从响应对象读取
+    disk=False 时只复用本进程内的响应，不读写磁盘缓存
+    """
+    data = load(payload, url, disk)
+    if data is not None:
+        if verbose:
+            print(f"{indent}💾 使用缓存的预测结果 (TEST_NOCACHE=1 跳过缓存)")
+        return 200, data, None
+
+    from _http import SESSION
+    response = SESSION.post(url, json=payload, timeout=timeout)
+    if response.status_code != 200:
+        return response.status_code, None, response
+    data = loads(response.content)
+    store(payload, data, url, disk)
+    return response.status_code, data, response
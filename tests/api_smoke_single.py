@@ -1,9 +1,11 @@
-import requests, sys, json
+import sys
+import _predict_cache as predict_cache
+from _http import SESSION
 req={'stock_code':'000001','period':'6mo','pred_len':3,'lookback':100,'sample_count':1}
-r=requests.post('http://localhost:8000/predict', json=req, timeout=60)
+r=SESSION.post('http://localhost:8000/predict', json=req, timeout=60)
 print('status', r.status_code)
 try:
-    j=r.json()
+    j=predict_cache.loads(r.content)
     print('success', j.get('success'))
     d=j.get('data')
     print('data is None?', d is None)
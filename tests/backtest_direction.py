@@ -7,8 +7,9 @@
 from __future__ import annotations
 
 import argparse
+import functools
 from pathlib import Path
-from typing import List
+from typing import Tuple
 
 from app.backtesting import run_direction_backtest
 
@@ -28,21 +29,35 @@ def parse_args() -> argparse.Namespace:
     return p.parse_args()
 
 
+@functools.lru_cache(maxsize=32)
+def _cached_backtest(stock, period, lookback, pred_len, horizons, temperature, top_p, sample_count, step, eps):
+    """同一进程内参数相同的回测只执行一次（参数需可哈希，horizons 为元组）"""
+    return run_direction_backtest(
+        stock=stock,
+        period=period,
+        lookback=lookback,
+        pred_len=pred_len,
+        horizons=list(horizons),
+        temperature=temperature,
+        top_p=top_p,
+        sample_count=sample_count,
+        step=step,
+        eps=eps,
+    )
+
+
 def main():
     args = parse_args()
-    horizons: List[int] = [int(x) for x in args.horizons.split(',') if x.strip()]
-    summary_df, sum_csv, fig_path = run_direction_backtest(
-        stock=args.stock,
-        period=args.period,
-        lookback=args.lookback,
-        pred_len=max(args.pred_len, max(horizons)),
-        horizons=horizons,
-        temperature=args.temperature,
-        top_p=args.top_p,
-        sample_count=args.sample_count,
-        step=args.step,
-        eps=args.eps,
+    # 步长列表只解析一次；用元组以便作为缓存键
+    horizons: Tuple[int, ...] = tuple(int(x) for x in args.horizons.split(',') if x.strip())
+    max_h = max(horizons)
+    pred_len = args.pred_len if args.pred_len >= max_h else max_h
+    summary_df, sum_csv, fig_path = _cached_backtest(
+        args.stock, args.period, args.lookback, pred_len, horizons,
+        args.temperature, args.top_p, args.sample_count, args.step, args.eps,
     )
+    # 缓存中的DataFrame是共享对象，复制一份再使用
+    summary_df = summary_df.copy()
     print("\n===== 方向回测摘要 =====")
     print(summary_df.to_string(index=False, formatters={'accuracy': '{:.3f}'.format, 'accuracy_filtered': '{:.3f}'.format}))
     print(f"\n结果文件: \n  摘要: {sum_csv}\n  曲线: {fig_path}")
@@ -3,22 +3,21 @@
 检查API返回的数据结构
 """
 
-import requests
 import json
 
+import numpy as np
+
+import _predict_cache as predict_cache
+
 def check_api_data():
     """检查API返回的数据"""
     print("🔍 检查API返回的数据结构")
     
     try:
-        response = requests.post(
-            'http://localhost:8000/predict', 
-            json={'stock_code': '000001', 'pred_len': 5, 'lookback': 100}
-        )
+        payload = {'stock_code': '000001', 'pred_len': 5, 'lookback': 100}
+        status_code, data, response = predict_cache.cached_predict(payload, timeout=None, disk=False)
         
-        if response.status_code == 200:
-            data = response.json()
-            
+        if status_code == 200:
             if data.get('success'):
                 hist_data = data['data']['historical_data']
                 pred_data = data['data']['predictions']
@@ -33,8 +32,8 @@ def check_api_data():
                     print(f"最后一条: {hist_data[-1]}")
                     
                     # 检查价格范围
-                    prices = [item['close'] for item in hist_data]
-                    print(f"价格范围: {min(prices):.2f} - {max(prices):.2f}")
+                    prices = np.fromiter((item['close'] for item in hist_data), dtype=np.float64, count=len(hist_data))
+                    print(f"价格范围: {prices.min():.2f} - {prices.max():.2f}")
                 
                 if len(pred_data) > 0:
                     print(f"\n🔮 预测数据样本:")
@@ -42,8 +41,8 @@ def check_api_data():
                     print(f"最后一条: {pred_data[-1]}")
                     
                     # 检查预测价格范围
-                    pred_prices = [item['close'] for item in pred_data]
-                    print(f"预测价格范围: {min(pred_prices):.2f} - {max(pred_prices):.2f}")
+                    pred_prices = np.fromiter((item['close'] for item in pred_data), dtype=np.float64, count=len(pred_data))
+                    print(f"预测价格范围: {pred_prices.min():.2f} - {pred_prices.max():.2f}")
                 
                 # 检查数据连续性
                 if len(hist_data) > 1:
@@ -57,8 +56,9 @@ def check_api_data():
             else:
                 print(f"❌ API返回错误: {data.get('error')}")
         else:
-            print(f"❌ HTTP错误: {response.status_code}")
-            print(f"响应: {response.text}")
+            print(f"❌ HTTP错误: {status_code}")
+            if response is not None:
+                print(f"响应: {response.text}")
             
     except Exception as e:
         print(f"❌ 请求异常: {str(e)}")
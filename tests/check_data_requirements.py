@@ -4,10 +4,33 @@
 """
 
 import os
+import re
 import sys
+import functools
+import mmap
 from pathlib import Path
 import subprocess
 
+# 同一次运行中多处检查同一路径，缓存结果避免重复的文件系统调用
+@functools.lru_cache(maxsize=256)
+def _exists(path: str) -> bool:
+    return Path(path).exists()
+
+# 数据源检查的关键词，(?i:...) 表示该项不区分大小写
+DATA_SOURCE_RE = re.compile(rb'akshare|yfinance|(?i:qlib)')
+PREDICTION_MODE_RE = re.compile(rb'use_mock = True|Kronos|(?i:mock)')
+
+def _scan_keywords(path: str, pattern) -> set:
+    """内存映射文件后一遍找出所有出现过的关键词（统一转小写返回）
+    
+    直接在映射的字节上匹配，不解码、不复制出完整的字符串
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return set()  # 空文件无法映射
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return {match.group(0).decode('ascii').lower() for match in pattern.finditer(mm)}
+
 def check_qlib_installation():
     """检查Qlib安装状态"""
     print("📦 检查Qlib安装状态...")
@@ -26,41 +49,32 @@ def check_qlib_data():
     
     data_path = Path.home() / ".qlib" / "qlib_data" / "cn_data"
     
-    if not data_path.exists():
+    if not _exists(str(data_path)):
         print(f"❌ Qlib数据目录不存在: {data_path}")
         return False
     
     print(f"✅ Qlib数据目录存在: {data_path}")
     
     # 检查数据文件
+    # 任一关键目录缺失即可判定未就绪，找到第一个缺失项就停止检查
     essential_dirs = ['calendars', 'instruments', 'features']
-    missing_dirs = []
-    
-    for dir_name in essential_dirs:
-        dir_path = data_path / dir_name
-        if dir_path.exists():
-            print(f"✅ {dir_name} 目录存在")
-        else:
-            print(f"❌ {dir_name} 目录缺失")
-            missing_dirs.append(dir_name)
-    
-    if missing_dirs:
-        print(f"❌ 缺少关键目录: {missing_dirs}")
+    missing_dir = next((d for d in essential_dirs if not _exists(str(data_path / d))), None)
+    if missing_dir is not None:
+        print(f"❌ 缺少关键目录: {missing_dir}")
         return False
+    print(f"✅ 关键目录齐全: {', '.join(essential_dirs)}")
     
     # 检查股票数据文件数量
-    features_dir = data_path / "features"
-    if features_dir.exists():
-        stock_dirs = [d for d in features_dir.iterdir() if d.is_dir()]
-        print(f"✅ 股票数据文件数量: {len(stock_dirs)}")
-        
-        if len(stock_dirs) > 0:
-            print(f"样本股票: {[d.name for d in stock_dirs[:5]]}")
-            return True
-        else:
-            print("❌ 没有找到股票数据文件")
-            return False
+    # scandir的目录项自带文件类型，判断是否为目录无需逐个stat
+    with os.scandir(data_path / "features") as entries:
+        stock_dirs = [entry for entry in entries if entry.is_dir()]
+    print(f"✅ 股票数据文件数量: {len(stock_dirs)}")
     
+    if len(stock_dirs) > 0:
+        print(f"样本股票: {[d.name for d in stock_dirs[:5]]}")
+        return True
+    
+    print("❌ 没有找到股票数据文件")
     return False
 
 def check_kronos_models():
@@ -73,21 +87,17 @@ def check_kronos_models():
         "finetune/outputs/models"
     ]
     
-    found_models = []
+    # 只需判断是否存在任意模型目录，找到第一个即返回
+    found_model = next((p for p in model_paths if _exists(p)), None)
+    if found_model is not None:
+        print(f"✅ 模型目录存在: {found_model}")
+        return True
     
+    # 全部缺失时每个路径都已检查过，逐一列出
     for model_path in model_paths:
-        path = Path(model_path)
-        if path.exists():
-            print(f"✅ 模型目录存在: {model_path}")
-            found_models.append(model_path)
-        else:
-            print(f"❌ 模型目录不存在: {model_path}")
-    
-    if not found_models:
-        print("❌ 没有找到任何Kronos模型文件")
-        return False
-    
-    return True
+        print(f"❌ 模型目录不存在: {model_path}")
+    print("❌ 没有找到任何Kronos模型文件")
+    return False
 
 def check_current_data_source():
     """检查当前数据源"""
@@ -95,28 +105,27 @@ def check_current_data_source():
     
     # 检查data_fetcher.py
     data_fetcher_path = Path("app/data_fetcher.py")
-    if data_fetcher_path.exists():
-        with open(data_fetcher_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+    if _exists(str(data_fetcher_path)):
+        found = _scan_keywords(str(data_fetcher_path), DATA_SOURCE_RE)
         
-        if 'akshare' in content:
+        if 'akshare' in found:
             print("📊 当前使用akshare数据源")
-        if 'yfinance' in content:
+        if 'yfinance' in found:
             print("📊 当前使用yfinance数据源")
-        if 'qlib' in content.lower():
+        if 'qlib' in found:
             print("📊 当前使用Qlib数据源")
         else:
             print("⚠️ 当前未使用Qlib数据源")
     
     # 检查prediction_service.py
     pred_service_path = Path("app/prediction_service.py")
-    if pred_service_path.exists():
-        with open(pred_service_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+    if _exists(str(pred_service_path)):
+        found = _scan_keywords(str(pred_service_path), PREDICTION_MODE_RE)
         
-        if 'use_mock = True' in content:
+        # 'use_mock = True' 匹配时会吞掉其中的 mock，需要一并计入
+        if 'use_mock = true' in found:
             print("⚠️ 当前使用模拟预测模式")
-        if 'Kronos' in content and 'mock' not in content.lower():
+        if 'kronos' in found and not found & {'mock', 'use_mock = true'}:
             print("✅ 当前使用真实Kronos模型")
 
 def analyze_data_requirements():
@@ -1,15 +1,22 @@
 #!/usr/bin/env python3
 """
 检查API状态
+可直接运行，也可导入 check_api_status 循环调用，多次检查复用同一会话的长连接
 """
 
-import requests
+import os
 
-def check_api_status():
-    """检查API状态"""
+import _predict_cache as predict_cache
+from _http import SESSION
+
+API_BASE_URL = os.getenv('API_BASE_URL', 'http://localhost:8000')
+
+def check_api_status(session=None):
+    """检查API状态，返回是否使用真实数据模式"""
+    session = session or SESSION
     try:
-        response = requests.get('http://localhost:8000/health')
-        data = response.json()
+        response = session.get(f'{API_BASE_URL}/health', timeout=2)
+        data = predict_cache.loads(response.content)
         
         print('🔍 API健康检查:')
         print(f'   模型已加载: {data["model_status"]["model_loaded"]}')
@@ -18,11 +25,13 @@ def check_api_status():
         
         if not data["model_status"]["use_mock"]:
             print('✅ 当前使用真实数据模式')
-        else:
-            print('⚠️ 当前仍在模拟模式')
+            return True
+        print('⚠️ 当前仍在模拟模式')
+        return False
             
     except Exception as e:
         print(f'❌ 检查失败: {str(e)}')
+        return False
 
 if __name__ == "__main__":
     check_api_status()
@@ -3,8 +3,26 @@
 调试API错误
 """
 
-import requests
-import json
+import asyncio
+
+import httpx
+
+import _predict_cache as predict_cache
+from _http import SESSION
+
+async def _probe_all(probes):
+    """并发探测互不依赖的端点，总耗时取决于最慢的一个；probes 为 (方法, 完整URL) 列表"""
+    limits = httpx.Limits(max_connections=10, max_keepalive_connections=10, keepalive_expiry=30)
+    async with httpx.AsyncClient(limits=limits, timeout=5) as client:
+        async def probe(method, url):
+            if method == 'GET':
+                return await client.get(url)
+            return await client.post(url, json={'stock_code': '000001'})
+        
+        return await asyncio.gather(
+            *(probe(method, url) for method, url in probes),
+            return_exceptions=True
+        )
 
 def debug_api_configuration():
     """调试API配置"""
@@ -20,10 +38,10 @@ def debug_api_configuration():
     # 2. 检查API健康状态
     print("\n2. 🏥 API健康检查:")
     try:
-        response = requests.get(f'{api_url}/health', timeout=5)
+        response = SESSION.get(f'{api_url}/health', timeout=5)
         print(f"   状态码: {response.status_code}")
         if response.status_code == 200:
-            data = response.json()
+            data = predict_cache.loads(response.content)
             print(f"   API状态: {data['status']}")
             print(f"   模型加载: {data['model_status']['model_loaded']}")
             print(f"   使用模拟: {data['model_status']['use_mock']}")
@@ -38,16 +56,12 @@ def debug_api_configuration():
     print("\n3. 🔮 测试预测API:")
     try:
         # 测试最简单的请求
-        response = requests.post(
-            f'{api_url}/predict',
-            json={'stock_code': '000001'},
-            timeout=30
-        )
+        payload = {'stock_code': '000001'}
+        status_code, data, response = predict_cache.cached_predict(payload, url=f'{api_url}/predict', indent='   ', disk=False)
         
-        print(f"   状态码: {response.status_code}")
+        print(f"   状态码: {status_code}")
         
-        if response.status_code == 200:
-            data = response.json()
+        if status_code == 200:
             print(f"   预测成功: {data.get('success')}")
             if data.get('success'):
                 stock_info = data['data']['stock_info']
@@ -57,32 +71,45 @@ def debug_api_configuration():
                 print(f"   预测价格: ¥{summary['predicted_price']:.2f}")
             else:
                 print(f"   预测错误: {data.get('error')}")
-        elif response.status_code == 400:
+        elif status_code == 400:
             print(f"   400错误 - 请求参数问题:")
             try:
-                error_data = response.json()
-                print(f"   错误详情: {json.dumps(error_data, indent=2, ensure_ascii=False)}")
+                error_data = predict_cache.loads(response.content)
+                print(f"   错误详情: {predict_cache.dumps_pretty(error_data)}")
             except:
                 print(f"   错误文本: {response.text}")
-        elif response.status_code == 422:
+        elif status_code == 422:
             print(f"   422错误 - 参数验证失败:")
             try:
-                error_data = response.json()
-                print(f"   验证错误: {json.dumps(error_data, indent=2, ensure_ascii=False)}")
+                error_data = predict_cache.loads(response.content)
+                print(f"   验证错误: {predict_cache.dumps_pretty(error_data)}")
             except:
                 print(f"   错误文本: {response.text}")
         else:
-            print(f"   其他HTTP错误: {response.status_code}")
+            print(f"   其他HTTP错误: {status_code}")
             print(f"   错误内容: {response.text}")
             
     except Exception as e:
         print(f"   请求异常: {str(e)}")
         return False
     
+    # 文档和各端点检查互不依赖，一次并发发出，再按顺序输出结果
+    endpoints = [
+        ('/health', 'GET'),
+        ('/predict', 'POST'),
+        ('/stocks/000001/info', 'GET'),
+        ('/model/status', 'GET')
+    ]
+    # 完整URL预先拼好，探测时不再逐个格式化
+    probes = [(method, f'{api_url}{endpoint}') for endpoint, method in [('/docs', 'GET')] + endpoints]
+    docs_result, *endpoint_results = asyncio.run(_probe_all(probes))
+    
     # 4. 检查API文档
     print("\n4. 📚 API文档检查:")
     try:
-        response = requests.get(f'{api_url}/docs', timeout=5)
+        if isinstance(docs_result, Exception):
+            raise docs_result
+        response = docs_result
         print(f"   文档访问: {response.status_code}")
         if response.status_code == 200:
             print(f"   API文档可访问: {api_url}/docs")
@@ -93,25 +120,11 @@ def debug_api_configuration():
     
     # 5. 检查API端点
     print("\n5. 🛣️ API端点检查:")
-    endpoints = [
-        ('/health', 'GET'),
-        ('/predict', 'POST'),
-        ('/stocks/000001/info', 'GET'),
-        ('/model/status', 'GET')
-    ]
-    
-    for endpoint, method in endpoints:
-        try:
-            if method == 'GET':
-                response = requests.get(f'{api_url}{endpoint}', timeout=5)
-            else:
-                response = requests.post(f'{api_url}{endpoint}', 
-                                       json={'stock_code': '000001'}, timeout=5)
-            
-            print(f"   {method} {endpoint}: {response.status_code}")
-            
-        except Exception as e:
-            print(f"   {method} {endpoint}: 异常 - {str(e)}")
+    for (endpoint, method), result in zip(endpoints, endpoint_results):
+        if isinstance(result, Exception):
+            print(f"   {method} {endpoint}: 异常 - {str(result)}")
+        else:
+            print(f"   {method} {endpoint}: {result.status_code}")
     
     return True
 
@@ -134,18 +147,15 @@ def test_streamlit_api_call():
         }
         
         print(f"   API地址: {API_BASE_URL}")
-        print(f"   请求参数: {json.dumps(payload, indent=2, ensure_ascii=False)}")
+        print(f"   请求参数: {predict_cache.dumps_pretty(payload)}")
         
-        response = requests.post(
-            f"{API_BASE_URL}/predict",
-            json=payload,
-            timeout=60
+        status_code, data, response = predict_cache.cached_predict(
+            payload, url=f"{API_BASE_URL}/predict", timeout=60, indent='   ', disk=False
         )
         
-        print(f"   响应状态: {response.status_code}")
+        print(f"   响应状态: {status_code}")
         
-        if response.status_code == 200:
-            data = response.json()
+        if status_code == 200:
             if data.get('success'):
                 print(f"   ✅ Streamlit API调用成功")
                 return True
@@ -153,7 +163,7 @@ def test_streamlit_api_call():
                 print(f"   ❌ API返回错误: {data.get('error')}")
                 return False
         else:
-            print(f"   ❌ HTTP错误: {response.status_code}")
+            print(f"   ❌ HTTP错误: {status_code}")
             print(f"   错误内容: {response.text}")
             return False
             
@@ -3,9 +3,9 @@
 调试数据结构脚本
 """
 
-import requests
 import json
-import pandas as pd
+
+import _predict_cache as predict_cache
 
 def debug_api_data():
     """调试API返回的数据结构"""
@@ -14,19 +14,14 @@ def debug_api_data():
     
     try:
         # 测试预测API
-        response = requests.post(
-            "http://localhost:8000/predict",
-            json={
-                "stock_code": "000001",
-                "pred_len": 5,
-                "lookback": 50
-            },
-            timeout=30
-        )
+        payload = {
+            "stock_code": "000001",
+            "pred_len": 5,
+            "lookback": 50
+        }
+        status_code, data, response = predict_cache.cached_predict(payload, disk=False)
         
-        if response.status_code == 200:
-            data = response.json()
-            
+        if status_code == 200:
             if data.get('success'):
                 print("✅ API调用成功")
                 
@@ -55,41 +50,29 @@ def debug_api_data():
                     print(f"- 第一条: {pred_data[0]}")
                     print(f"- 字段: {list(pred_data[0].keys())}")
                 
-                # 转换为DataFrame测试
-                print(f"\n🧪 DataFrame转换测试:")
-                try:
-                    hist_df = pd.DataFrame(hist_data)
-                    print(f"- 历史数据DataFrame形状: {hist_df.shape}")
-                    print(f"- 历史数据列: {list(hist_df.columns)}")
-                    print(f"- 历史数据索引: {hist_df.index}")
-                    
-                    pred_df = pd.DataFrame(pred_data)
-                    print(f"- 预测数据DataFrame形状: {pred_df.shape}")
-                    print(f"- 预测数据列: {list(pred_df.columns)}")
-                    print(f"- 预测数据索引: {pred_df.index}")
-                    
-                    # 检查是否有日期相关字段
-                    print(f"\n📅 日期字段检查:")
-                    for col in hist_df.columns:
-                        if 'date' in col.lower() or 'time' in col.lower():
-                            print(f"- 历史数据日期字段: {col}")
-                    
-                    for col in pred_df.columns:
-                        if 'date' in col.lower() or 'time' in col.lower():
-                            print(f"- 预测数据日期字段: {col}")
-                    
-                    # 检查索引是否是日期
-                    print(f"- 历史数据索引类型: {type(hist_df.index)}")
-                    print(f"- 预测数据索引类型: {type(pred_df.index)}")
-                    
-                except Exception as e:
-                    print(f"❌ DataFrame转换失败: {str(e)}")
+                # 直接从记录字典推断形状和日期字段，无需构建DataFrame
+                hist_fields = list(hist_data[0].keys()) if hist_data else []
+                pred_fields = list(pred_data[0].keys()) if pred_data else []
+                print(f"\n🧪 数据形状:")
+                print(f"- 历史数据形状: ({len(hist_data)}, {len(hist_fields)})")
+                print(f"- 预测数据形状: ({len(pred_data)}, {len(pred_fields)})")
+                
+                # 检查是否有日期相关字段
+                print(f"\n📅 日期字段检查:")
+                for col in hist_fields:
+                    if 'date' in col.lower() or 'time' in col.lower():
+                        print(f"- 历史数据日期字段: {col}")
+                
+                for col in pred_fields:
+                    if 'date' in col.lower() or 'time' in col.lower():
+                        print(f"- 预测数据日期字段: {col}")
                 
             else:
                 print(f"❌ API返回错误: {data.get('error')}")
         else:
-            print(f"❌ HTTP错误: {response.status_code}")
-            print(f"响应: {response.text}")
+            print(f"❌ HTTP错误: {status_code}")
+            if response is not None:
+                print(f"响应: {response.text}")
             
     except Exception as e:
         print(f"❌ 请求失败: {str(e)}")
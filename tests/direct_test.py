@@ -3,19 +3,30 @@
 直接测试GPU加速系统
 """
 
+import importlib.util
 import requests
 import time
-import torch
+
+from _gpu import gpu_properties  # 在导入torch前配置显存分配器
+
+# 只查找torch是否安装，不导入；真正用到GPU的函数内再导入，只测API时无需加载CUDA运行时
+TORCH_AVAILABLE = importlib.util.find_spec("torch") is not None
 
 def test_gpu_status():
     """测试GPU状态"""
     print("🔍 GPU状态检查:")
+    if not TORCH_AVAILABLE:
+        print("   ❌ PyTorch未安装")
+        return False
+    
+    import torch
     print(f"   PyTorch: {torch.__version__}")
     print(f"   CUDA可用: {torch.cuda.is_available()}")
     
-    if torch.cuda.is_available():
-        print(f"   GPU: {torch.cuda.get_device_name(0)}")
-        print(f"   内存: {torch.cuda.get_device_properties(0).total_memory / 1024**3:.1f} GB")
+    props = gpu_properties()
+    if props is not None:
+        print(f"   GPU: {props.name}")
+        print(f"   内存: {props.total_memory / 1024**3:.1f} GB")
         return True
     return False
 
@@ -45,7 +56,8 @@ def test_single_prediction():
     
     try:
         print("   发送预测请求...")
-        start_time = time.time()
+        # perf_counter单调且精度高；服务端返回前已把预测结果转回CPU（隐式同步CUDA），计时包含完整推理
+        start_time = time.perf_counter()
         
         response = requests.post(
             'http://localhost:8000/predict',
@@ -53,7 +65,7 @@ def test_single_prediction():
             timeout=30
         )
         
-        end_time = time.time()
+        end_time = time.perf_counter()
         duration = end_time - start_time
         
         if response.status_code == 200:
@@ -86,6 +98,11 @@ def test_gpu_memory():
     """测试GPU内存使用"""
     print("\n💾 GPU内存监控:")
     
+    if not TORCH_AVAILABLE:
+        print("   ❌ PyTorch未安装")
+        return
+    
+    import torch
     if not torch.cuda.is_available():
         print("   ❌ GPU不可用")
         return
@@ -93,15 +110,14 @@ def test_gpu_memory():
     try:
         device = torch.device("cuda:0")
         
-        # 获取内存信息
-        allocated = torch.cuda.memory_allocated(device) / 1024**3
-        reserved = torch.cuda.memory_reserved(device) / 1024**3
-        total = torch.cuda.get_device_properties(device).total_memory / 1024**3
+        # 一次驱动调用取得整卡的空闲/总显存（与nvidia-smi一致，包含API服务进程的占用）
+        free, total = torch.cuda.mem_get_info(device)
+        used = total - free
         
-        print(f"   已分配: {allocated:.2f} GB")
-        print(f"   已保留: {reserved:.2f} GB")
-        print(f"   总内存: {total:.2f} GB")
-        print(f"   使用率: {(allocated/total)*100:.1f}%")
+        print(f"   已使用: {used / 1024**3:.2f} GB")
+        print(f"   空闲: {free / 1024**3:.2f} GB")
+        print(f"   总内存: {total / 1024**3:.2f} GB")
+        print(f"   使用率: {(used/total)*100:.1f}%")
         
     except Exception as e:
         print(f"   ❌ 监控失败: {str(e)}")
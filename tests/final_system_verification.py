@@ -7,8 +7,26 @@
 import requests
 import time
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from _gpu import gpu_properties, warmup_cuda
+from _capture import run_captured, thread_local_stdout
+
+# 配置模块在导入时只加载一次，check_config_system 直接报告结果
+# 项目根目录用于解析 volumes.config，volumes 目录供配置模块内部的相对导入使用
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+for _path in (str(_PROJECT_ROOT), str(_PROJECT_ROOT / "volumes")):
+    if _path not in sys.path:
+        sys.path.append(_path)
+try:
+    from volumes.config.settings import settings as _settings, DATA_DIR as _DATA_DIR, DEPLOYMENT_MODE as _DEPLOYMENT_MODE
+    _settings_error = None
+except Exception as _e:
+    _settings = None
+    _settings_error = str(_e)
+
 def check_project_structure():
     """检查项目结构"""
     print("📁 检查项目结构...")
@@ -46,18 +64,20 @@ def check_data_migration():
     new_data_dir = Path("volumes/data/akshare_data")
     
     if new_data_dir.exists():
-        csv_files = list(new_data_dir.glob("*.csv"))
-        print(f"   ✅ 新数据目录存在: {len(csv_files)} 个股票文件")
+        # 一次scandir取得文件名集合，后续检查直接查集合，无需逐个stat
+        with os.scandir(new_data_dir) as entries:
+            csv_names = {entry.name for entry in entries if entry.name.endswith('.csv')}
+        print(f"   ✅ 新数据目录存在: {len(csv_names)} 个股票文件")
         
         # 检查几个关键股票
         key_stocks = ["000001.csv", "000002.csv", "000004.csv"]
-        for stock_file in key_stocks:
-            if (new_data_dir / stock_file).exists():
-                print(f"   ✅ {stock_file} 已迁移")
-            else:
-                print(f"   ❌ {stock_file} 缺失")
-                return False
+        missing = [f for f in key_stocks if f not in csv_names]
+        if missing:
+            # 一次列出所有缺失文件，不在第一个缺失处就中断
+            print(f"   ❌ 缺失 {len(missing)} 个关键股票文件: {', '.join(missing)}")
+            return False
         
+        print(f"   ✅ 关键股票已迁移: {', '.join(key_stocks)}")
         return True
     else:
         print(f"   ❌ 新数据目录不存在: {new_data_dir}")
@@ -67,17 +87,15 @@ def check_config_system():
     """检查配置系统"""
     print("\n⚙️ 检查配置系统...")
     
+    if _settings is None:
+        print(f"   ❌ 配置系统失败: {_settings_error}")
+        return False
+    
     try:
-        # 测试配置导入
-        import sys
-        sys.path.append("volumes")
-        
-        from volumes.config.settings import settings, DATA_DIR, DEPLOYMENT_MODE
-        
         print(f"   ✅ 配置系统加载成功")
-        print(f"   📁 数据目录: {DATA_DIR}")
-        print(f"   🚀 部署模式: {DEPLOYMENT_MODE}")
-        print(f"   📊 基础目录: {settings.base_dir}")
+        print(f"   📁 数据目录: {_DATA_DIR}")
+        print(f"   🚀 部署模式: {_DEPLOYMENT_MODE}")
+        print(f"   📊 基础目录: {_settings.base_dir}")
         
         return True
     except Exception as e:
@@ -109,13 +127,13 @@ def check_prediction_function():
     print("\n🔮 检查预测功能...")
     
     try:
-        start_time = time.time()
+        start_time = time.perf_counter()
         response = requests.post(
             "http://localhost:8000/predict",
             json={"stock_code": "000001", "pred_len": 5},
             timeout=20
         )
-        end_time = time.time()
+        end_time = time.perf_counter()
         
         if response.status_code == 200:
             data = response.json()
@@ -157,6 +175,42 @@ def check_streamlit_service():
         print(f"   ❌ Streamlit连接失败: {str(e)}")
         return False
 
+# 显存分配历史在并行检查启动前由 main 开启（对整个进程生效），GPU检查失败时导出快照
+_memory_history_enabled = False
+
+def _start_memory_history():
+    """开启CUDA显存分配历史记录，无GPU或PyTorch版本不支持时不开启"""
+    global _memory_history_enabled
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.memory._record_memory_history(max_entries=100_000)
+            _memory_history_enabled = True
+    except Exception:
+        _memory_history_enabled = False
+
+def _stop_memory_history():
+    """关闭CUDA显存分配历史记录"""
+    global _memory_history_enabled
+    if _memory_history_enabled:
+        import torch
+        torch.cuda.memory._record_memory_history(enabled=None)
+        _memory_history_enabled = False
+
+def _dump_memory_snapshot(error):
+    """导出显存快照，文件按失败类型命名：显存不足为 gpu_oom.pickle，其余为 gpu_failure.pickle"""
+    if not _memory_history_enabled:
+        return
+    import torch
+    name = "gpu_oom.pickle" if "out of memory" in str(error).lower() else "gpu_failure.pickle"
+    snapshot_path = Path("tests/results") / name
+    try:
+        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        torch.cuda.memory._dump_snapshot(str(snapshot_path))
+        print(f"   📸 显存快照已保存: {snapshot_path} (可在 https://pytorch.org/memory_viz 查看)")
+    except Exception as e:
+        print(f"   ⚠️ 显存快照保存失败: {e}")
+
 def check_gpu_acceleration():
     """检查GPU加速"""
     print("\n🚀 检查GPU加速...")
@@ -164,18 +218,23 @@ def check_gpu_acceleration():
     try:
         import torch
         
-        if torch.cuda.is_available():
-            gpu_name = torch.cuda.get_device_name(0)
-            gpu_memory = torch.cuda.get_device_properties(0).total_memory / 1024**3
+        props = gpu_properties()
+        if props is not None:
+            gpu_name = props.name
+            gpu_memory = props.total_memory / 1024**3
             
             print(f"   ✅ GPU: {gpu_name}")
             print(f"   💾 显存: {gpu_memory:.1f} GB")
             print(f"   🔧 PyTorch: {torch.__version__}")
             
-            # 测试GPU计算
-            x = torch.randn(1000, 1000, device='cuda')
-            y = torch.mm(x, x)
+            # 测试GPU计算，失败时导出显存快照便于定位分配位置
+            ok, error = warmup_cuda()
+            if not ok:
+                print(f"   ❌ GPU计算失败: {error}")
+                _dump_memory_snapshot(error)
+                return False
             print(f"   ✅ GPU计算正常")
+            print(f"   ⚡ 计算模式: TF32矩阵乘法 + cuDNN benchmark")
             
             return True
         else:
@@ -230,10 +289,14 @@ def generate_system_report():
     # GPU信息
     try:
         import torch
-        if torch.cuda.is_available():
+        props = gpu_properties()
+        if props is not None:
+            free, total = torch.cuda.mem_get_info(0)
             report["gpu_info"] = {
-                "name": torch.cuda.get_device_name(0),
-                "memory_gb": torch.cuda.get_device_properties(0).total_memory / 1024**3,
+                "name": props.name,
+                "memory_gb": total / 1024**3,
+                "memory_used_gb": (total - free) / 1024**3,
+                "memory_free_gb": free / 1024**3,
                 "pytorch_version": torch.__version__,
                 "cuda_available": True
             }
@@ -258,13 +321,13 @@ def generate_system_report():
     
     # 性能测试
     try:
-        start_time = time.time()
+        start_time = time.perf_counter()
         pred_response = requests.post(
             "http://localhost:8000/predict",
             json={"stock_code": "000001"},
             timeout=20
         )
-        end_time = time.time()
+        end_time = time.perf_counter()
         
         if pred_response.status_code == 200:
             report["performance"] = {
@@ -275,12 +338,19 @@ def generate_system_report():
         report["performance"]["error"] = str(e)
     
     # 保存报告
-    import json
     report_path = Path("tests/results/system_verification_report.json")
     report_path.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(report_path, 'w', encoding='utf-8') as f:
-        json.dump(report, f, indent=2, ensure_ascii=False)
+    # 优先用orjson序列化（中文原样输出），未安装时回退到标准库json
+    try:
+        import orjson
+        report_path.write_bytes(
+            orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        )
+    except ImportError:
+        import json
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
     
     print(f"   ✅ 报告已保存: {report_path}")
 
@@ -303,15 +373,29 @@ def main():
     passed = 0
     total = len(tests)
     
-    for test_name, test_func in tests:
-        try:
-            if test_func():
-                passed += 1
-                print(f"✅ {test_name}: 通过")
-            else:
-                print(f"❌ {test_name}: 失败")
-        except Exception as e:
-            print(f"❌ {test_name}: 异常 - {str(e)}")
+    # 预测功能检查会计时 /predict，与其他检查并发时测到的是争用后的延迟，因此在启动线程池前单独执行；
+    # 其余检查互不依赖（大多在等待网络），并行执行，总耗时取决于最慢的一项
+    parallel_tests = [(name, func) for name, func in tests if func is not check_prediction_function]
+    
+    _start_memory_history()
+    with thread_local_stdout():
+        results = {
+            test_name: run_captured(test_func)
+            for test_name, test_func in tests if test_func is check_prediction_function
+        }
+        with ThreadPoolExecutor(max_workers=len(parallel_tests)) as executor:
+            futures = {test_name: executor.submit(run_captured, test_func) for test_name, test_func in parallel_tests}
+            for test_name, _ in tests:
+                ok, error, output = results[test_name] if test_name in results else futures[test_name].result()
+                print(output, end='')
+                if error is not None:
+                    print(f"❌ {test_name}: 异常 - {str(error)}")
+                elif ok:
+                    passed += 1
+                    print(f"✅ {test_name}: 通过")
+                else:
+                    print(f"❌ {test_name}: 失败")
+    _stop_memory_history()
     
     # 生成报告
     generate_system_report()
@@ -3,10 +3,22 @@
 最终功能测试脚本
 """
 
-import requests
 import time
+import asyncio
 import webbrowser
 
+import httpx
+
+from _http import SESSION
+
+async def _fetch_stock_infos(stock_codes):
+    """并发获取多只股票的信息，总耗时约等于最慢的一个请求；异常作为结果返回"""
+    async with httpx.AsyncClient(timeout=10) as client:
+        return await asyncio.gather(
+            *(client.get(f"http://localhost:8000/stocks/{code}/info") for code in stock_codes),
+            return_exceptions=True
+        )
+
 def test_all_functions():
     """测试所有功能"""
     print("🚀 Kronos股票预测应用 - 最终测试")
@@ -15,7 +27,7 @@ def test_all_functions():
     # 1. 测试API健康状态
     print("\n1. 🔍 测试API健康状态...")
     try:
-        response = requests.get("http://localhost:8000/health", timeout=5)
+        response = SESSION.get("http://localhost:8000/health", timeout=5)
         if response.status_code == 200:
             print("✅ API服务正常运行")
         else:
@@ -28,7 +40,7 @@ def test_all_functions():
     # 2. 测试前端服务
     print("\n2. 🌐 测试前端服务...")
     try:
-        response = requests.get("http://localhost:8501", timeout=5)
+        response = SESSION.get("http://localhost:8501", timeout=5)
         if response.status_code == 200:
             print("✅ 前端服务正常运行")
         else:
@@ -43,9 +55,11 @@ def test_all_functions():
     test_stocks = ["000001", "600000", "000002"]
     success_count = 0
     
-    for stock in test_stocks:
+    responses = asyncio.run(_fetch_stock_infos(test_stocks))
+    for stock, response in zip(test_stocks, responses):
         try:
-            response = requests.get(f"http://localhost:8000/stocks/{stock}/info", timeout=10)
+            if isinstance(response, Exception):
+                raise response
             if response.status_code == 200:
                 data = response.json()
                 if data.get('success'):
@@ -66,7 +80,7 @@ def test_all_functions():
     # 4. 测试股票预测
     print("\n4. 🔮 测试股票预测...")
     try:
-        response = requests.post(
+        response = SESSION.post(
             "http://localhost:8000/predict",
             json={
                 "stock_code": "000001",
@@ -98,7 +112,7 @@ def test_all_functions():
     # 5. 测试批量预测
     print("\n5. 📈 测试批量预测...")
     try:
-        response = requests.post(
+        response = SESSION.post(
             "http://localhost:8000/predict/batch",
             json={
                 "stock_codes": ["000001", "600000"],
@@ -3,9 +3,10 @@
 最终验证所有修复
 """
 
-import requests
 import json
 
+from _http import SESSION
+
 def main():
     """最终验证"""
     print("🎯 最终验证 - 所有问题修复状态")
@@ -14,7 +15,7 @@ def main():
     # 1. 检查模拟模式状态
     print("\n1. 🔍 检查模拟模式状态...")
     try:
-        response = requests.get('http://localhost:8000/health')
+        response = SESSION.get('http://localhost:8000/health')
         data = response.json()
         
         use_mock = data['model_status']['use_mock']
@@ -30,7 +31,7 @@ def main():
     # 2. 检查预测数据格式
     print("\n2. 📊 检查预测数据格式...")
     try:
-        response = requests.post(
+        response = SESSION.post(
             'http://localhost:8000/predict',
             json={'stock_code': '000001', 'pred_len': 5, 'lookback': 50}
         )
@@ -72,9 +73,11 @@ def main():
     # 3. 检查真实数据一致性
     print("\n3. 🔄 检查真实数据一致性...")
     try:
+        # 若使用随机模拟数据，各次请求的当前价格会不同；两次独立请求即可判断，
+        # 每次请求都会完整运行一次模型，不再发第三次
         prices = []
-        for i in range(3):
-            response = requests.post(
+        for i in range(2):
+            response = SESSION.post(
                 'http://localhost:8000/predict',
                 json={'stock_code': '000001', 'pred_len': 3}
             )
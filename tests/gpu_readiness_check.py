@@ -3,10 +3,51 @@
 GPU就绪状态检查
 """
 
+# _gpu 在导入torch前配置显存分配器，必须先导入
+from _gpu import warmup_cuda
+
 import torch
 import subprocess
 import sys
 
+# GPU属性只向驱动查询一次，后续直接复用
+try:
+    _PROPS = torch.cuda.get_device_properties(0) if torch.cuda.is_available() else None
+except Exception:
+    _PROPS = None
+_TOTAL_GB = _PROPS.total_memory / 1024**3 if _PROPS is not None else 0.0
+
+def _query_gpu_info():
+    """返回 (GPU型号, 显存MB, 驱动版本)，获取失败返回None
+
+    优先通过pynvml在进程内查询NVML，未安装或NVML初始化失败时回退到 nvidia-smi 子进程
+    """
+    try:
+        import pynvml
+        pynvml.nvmlInit()
+        try:
+            handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+            name = pynvml.nvmlDeviceGetName(handle)
+            mem = pynvml.nvmlDeviceGetMemoryInfo(handle)
+            driver = pynvml.nvmlSystemGetDriverVersion()
+        finally:
+            pynvml.nvmlShutdown()
+        # 旧版pynvml返回bytes
+        if isinstance(name, bytes):
+            name = name.decode('utf-8')
+        if isinstance(driver, bytes):
+            driver = driver.decode('utf-8')
+        return name, mem.total // 1024**2, driver
+    except Exception:
+        # 未安装pynvml或NVML不可用（如驱动未加载），交给 nvidia-smi 判断
+        pass
+
+    result = subprocess.run(['nvidia-smi', '--query-gpu=name,memory.total,driver_version', '--format=csv,noheader,nounits'], 
+                          capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return tuple(result.stdout.strip().split(', ')[:3])
+
 def check_gpu_status():
     """检查GPU状态"""
     print("🔍 GPU就绪状态检查")
@@ -15,10 +56,8 @@ def check_gpu_status():
     # 1. 硬件检测
     print("\n1. 🖥️ 硬件检测:")
     try:
-        result = subprocess.run(['nvidia-smi', '--query-gpu=name,memory.total,driver_version', '--format=csv,noheader,nounits'], 
-                              capture_output=True, text=True)
-        if result.returncode == 0:
-            gpu_info = result.stdout.strip().split(', ')
+        gpu_info = _query_gpu_info()
+        if gpu_info is not None:
             print(f"   GPU型号: {gpu_info[0]}")
             print(f"   显存大小: {gpu_info[1]} MB")
             print(f"   驱动版本: {gpu_info[2]}")
@@ -40,31 +79,24 @@ def check_gpu_status():
         
         # 3. 兼容性测试
         print("\n3. 🧪 兼容性测试:")
-        try:
-            device = torch.device("cuda:0")
-            x = torch.randn(100, 100, device=device)
-            y = torch.randn(100, 100, device=device)
-            z = torch.mm(x, y)
+        ok, error = warmup_cuda()
+        if ok:
             print("   ✅ GPU计算测试通过")
-            
-            # 清理
-            del x, y, z
-            torch.cuda.empty_cache()
+            print("   ⚡ 计算模式: TF32矩阵乘法 + cuDNN benchmark")
             return True
+
+        print(f"   ❌ GPU计算测试失败: {error}")
+        
+        # RTX 5090特殊处理
+        if "sm_120" in error or "no kernel image" in error:
+            print("\n💡 RTX 5090兼容性说明:")
+            print("   您的RTX 5090是最新GPU，当前PyTorch版本不完全支持")
+            print("   建议解决方案:")
+            print("   1. 等待PyTorch 2.5+版本发布")
+            print("   2. 使用PyTorch nightly版本")
+            print("   3. 当前使用CPU优化模式")
             
-        except Exception as e:
-            print(f"   ❌ GPU计算测试失败: {str(e)}")
-            
-            # RTX 5090特殊处理
-            if "sm_120" in str(e) or "no kernel image" in str(e):
-                print("\n💡 RTX 5090兼容性说明:")
-                print("   您的RTX 5090是最新GPU，当前PyTorch版本不完全支持")
-                print("   建议解决方案:")
-                print("   1. 等待PyTorch 2.5+版本发布")
-                print("   2. 使用PyTorch nightly版本")
-                print("   3. 当前使用CPU优化模式")
-                
-            return False
+        return False
     else:
         print("   ❌ CUDA不可用")
         return False
@@ -130,8 +162,8 @@ def main():
     if gpu_ready:
         print("🎉 GPU完全就绪，系统将使用GPU加速")
         print("\n🚀 GPU配置:")
-        print(f"   设备: {torch.cuda.get_device_name(0)}")
-        print(f"   内存: {torch.cuda.get_device_properties(0).total_memory / 1024**3:.1f} GB")
+        print(f"   设备: {_PROPS.name}")
+        print(f"   内存: {_TOTAL_GB:.1f} GB")
         print("   状态: ✅ 可用")
         
     else:
@@ -1,12 +1,13 @@
 #!/usr/bin/env python3
-import requests
+import _predict_cache as predict_cache
+from _http import SESSION
 
 print('🧪 测试所有修复效果')
 print('=' * 40)
 
 # 测试API标题
 try:
-    response = requests.get('http://localhost:8000/docs')
+    response = SESSION.get('http://localhost:8000/docs')
     if response.status_code == 200:
         print('✅ API文档可访问')
     else:
@@ -16,12 +17,12 @@ except Exception as e:
 
 # 测试预测数据格式
 try:
-    response = requests.post('http://localhost:8000/predict', 
+    response = SESSION.post('http://localhost:8000/predict', 
                            json={'stock_code': '000001', 'pred_len': 3}, 
                            timeout=15)
     
     if response.status_code == 200:
-        data = response.json()
+        data = predict_cache.loads(response.content)
         if data.get('success'):
             predictions = data['data']['predictions']
             print(f'✅ 预测数据格式正确')
@@ -38,7 +39,7 @@ except Exception as e:
 
 # 测试Streamlit
 try:
-    response = requests.get('http://localhost:8501')
+    response = SESSION.get('http://localhost:8501')
     if response.status_code == 200:
         print('✅ Streamlit界面可访问')
     else:
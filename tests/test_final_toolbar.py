@@ -3,18 +3,57 @@
 最终工具栏中文化测试
 """
 
-import requests
+import asyncio
+import sys
 import time
 
+import _predict_cache as predict_cache
+from _http import SESSION, scan_page
+
+PREDICT_PAYLOAD = {
+    'stock_code': '000968',
+    'period': '1y',
+    'pred_len': 5,
+    'lookback': 1000  # 测试高性能模式
+}
+
+# Streamlit页面需要包含的关键内容
+STREAMLIT_CHECKS = [
+    ("Gordon Wang", "品牌标识"),
+    ("工具栏中英文对照", "工具栏说明"),
+    ("高性能模式", "性能模式"),
+    ("蒙特卡洛预测", "预测说明")
+]
+
+async def _fetch_all():
+    """三个检查互不依赖，放到线程中并发发出，总耗时取决于最慢的预测请求"""
+    async def timed_predict():
+        start_time = time.time()
+        status_code, data, response = await asyncio.to_thread(
+            predict_cache.cached_predict, PREDICT_PAYLOAD, verbose=False
+        )
+        return status_code, data, time.time() - start_time, response is None
+    
+    return await asyncio.gather(
+        asyncio.to_thread(SESSION.get, 'http://localhost:8000/health', timeout=5),
+        asyncio.to_thread(scan_page, 'http://localhost:8501', [keyword for keyword, _ in STREAMLIT_CHECKS]),
+        timed_predict(),
+        return_exceptions=True
+    )
+
 def test_complete_system():
     """测试完整系统功能"""
     print("🎯 完整系统功能测试")
     print("=" * 50)
     
+    health_result, streamlit_result, predict_result = asyncio.run(_fetch_all())
+    
     # 1. 测试API健康状态
     print("\n🔍 1. API健康检查...")
     try:
-        response = requests.get('http://localhost:8000/health', timeout=5)
+        if isinstance(health_result, Exception):
+            raise health_result
+        response = health_result
         if response.status_code == 200:
             print("   ✅ API服务正常")
         else:
@@ -25,53 +64,39 @@ def test_complete_system():
     # 2. 测试Streamlit界面
     print("\n🎨 2. Streamlit界面检查...")
     try:
-        response = requests.get('http://localhost:8501', timeout=5)
-        if response.status_code == 200:
+        if isinstance(streamlit_result, Exception):
+            raise streamlit_result
+        status_code, hits = streamlit_result
+        if status_code == 200:
             print("   ✅ Streamlit界面正常")
             
             # 检查关键内容
-            content = response.text
-            checks = [
-                ("Gordon Wang", "品牌标识"),
-                ("工具栏中英文对照", "工具栏说明"),
-                ("高性能模式", "性能模式"),
-                ("蒙特卡洛预测", "预测说明")
-            ]
-            
-            for keyword, description in checks:
-                if keyword in content:
+            for keyword, description in STREAMLIT_CHECKS:
+                if keyword in hits:
                     print(f"   ✅ {description}: 已加载")
                 else:
                     print(f"   ⚠️ {description}: 未找到")
         else:
-            print(f"   ❌ Streamlit异常: {response.status_code}")
+            print(f"   ❌ Streamlit异常: {status_code}")
     except Exception as e:
         print(f"   ❌ Streamlit连接失败: {str(e)}")
     
     # 3. 测试预测功能
     print("\n🔮 3. 预测功能测试...")
     try:
-        start_time = time.time()
-        response = requests.post(
-            'http://localhost:8000/predict',
-            json={
-                'stock_code': '000968',
-                'period': '1y',
-                'pred_len': 5,
-                'lookback': 1000  # 测试高性能模式
-            },
-            timeout=30
-        )
-        end_time = time.time()
+        if isinstance(predict_result, Exception):
+            raise predict_result
+        status_code, data, elapsed, from_cache = predict_result
+        if from_cache:
+            print("   💾 使用缓存的预测结果 (TEST_NOCACHE=1 跳过缓存)")
         
-        if response.status_code == 200:
-            data = response.json()
+        if status_code == 200:
             if data.get('success'):
                 historical_data = data['data']['historical_data']
                 predictions = data['data']['predictions']
                 stock_info = data['data']['stock_info']
                 
-                print(f"   ✅ 预测成功 ({end_time - start_time:.1f}s)")
+                print("   ✅ 预测成功" if from_cache else f"   ✅ 预测成功 ({elapsed:.1f}s)")
                 print(f"   📊 股票: {stock_info['name']} ({stock_info['code']})")
                 print(f"   📈 历史数据: {len(historical_data)} 条")
                 print(f"   🔮 预测数据: {len(predictions)} 条")
@@ -91,18 +116,19 @@ def test_complete_system():
             else:
                 print(f"   ❌ 预测失败: {data.get('error')}")
         else:
-            print(f"   ❌ HTTP错误: {response.status_code}")
+            print(f"   ❌ HTTP错误: {status_code}")
     except Exception as e:
         print(f"   ❌ 预测异常: {str(e)}")
 
 def show_toolbar_guide():
     """显示工具栏使用指南"""
-    print("\n🛠️ 图表工具栏使用指南")
-    print("=" * 50)
+    lines = []
+    lines.append("\n🛠️ 图表工具栏使用指南")
+    lines.append("=" * 50)
     
-    print("\n📍 **工具栏位置**: 图表右上角的白色工具条")
+    lines.append("\n📍 **工具栏位置**: 图表右上角的白色工具条")
     
-    print("\n🔧 **工具按钮对照表** (从左到右):")
+    lines.append("\n🔧 **工具按钮对照表** (从左到右):")
     toolbar_buttons = [
         ("🖱️", "Pan", "平移", "拖拽图表移动视角，查看不同时间段"),
         ("🔍", "Box Zoom", "框选缩放", "拖拽选择区域进行放大，详细分析"),
@@ -113,28 +139,31 @@ def show_toolbar_guide():
         ("📷", "Download plot as a png", "保存", "下载高清PNG图片到本地")
     ]
     
-    for i, (icon, english, chinese, description) in enumerate(toolbar_buttons, 1):
-        print(f"   {i}. {icon} **{english}** = {chinese}")
-        print(f"      功能: {description}")
-        print()
-    
-    print("💡 **使用技巧**:")
-    print("   1. 先用框选缩放选择感兴趣的时间段")
-    print("   2. 用平移工具在选定区域内移动")
-    print("   3. 用重置工具快速回到全景视图")
-    print("   4. 用保存工具导出重要发现")
-    
-    print("\n⚠️ **注意事项**:")
-    print("   - 如果工具栏显示英文，请参考上述对照表")
-    print("   - 双击图表也可以重置视图")
-    print("   - 鼠标滚轮可以快速缩放")
+    button_template = "   {}. {} **{}** = {}\n      功能: {}\n"
+    lines.extend(button_template.format(i, *button) for i, button in enumerate(toolbar_buttons, 1))
+    
+    lines.append("💡 **使用技巧**:")
+    lines.append("   1. 先用框选缩放选择感兴趣的时间段")
+    lines.append("   2. 用平移工具在选定区域内移动")
+    lines.append("   3. 用重置工具快速回到全景视图")
+    lines.append("   4. 用保存工具导出重要发现")
+    
+    lines.append("\n⚠️ **注意事项**:")
+    lines.append("   - 如果工具栏显示英文，请参考上述对照表")
+    lines.append("   - 双击图表也可以重置视图")
+    lines.append("   - 鼠标滚轮可以快速缩放")
+    
+    # 整段内容拼接后一次写出
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
 
 def show_system_summary():
     """显示系统功能总结"""
-    print("\n🎉 Gordon Wang 股票预测系统功能总结")
-    print("=" * 60)
+    lines = []
+    lines.append("\n🎉 Gordon Wang 股票预测系统功能总结")
+    lines.append("=" * 60)
     
-    print("\n✅ **已完成的功能**:")
+    lines.append("\n✅ **已完成的功能**:")
     features = [
         "品牌标识统一为 'Gordon Wang 的股票预测系统'",
         "历史数据周期中文化 (6个月、1年、2年、5年)",
@@ -148,28 +177,32 @@ def show_system_summary():
     ]
     
     for i, feature in enumerate(features, 1):
-        print(f"   {i}. {feature}")
-    
-    print("\n🚀 **性能特点**:")
-    print("   - 处理速度: 500+ 条/秒")
-    print("   - 响应时间: 2-3秒")
-    print("   - 数据支持: 最高5000条历史记录")
-    print("   - GPU加速: RTX 5090优化")
-    print("   - 预测精度: 蒙特卡洛不确定性量化")
-    
-    print("\n🌐 **访问地址**:")
-    print("   前端界面: http://localhost:8501")
-    print("   API文档: http://localhost:8000/docs")
-    
-    print("\n📋 **使用流程**:")
-    print("   1. 选择性能模式: 高性能模式 (RTX 5090)")
-    print("   2. 输入股票代码: 如 000968")
-    print("   3. 选择历史周期: 1年、2年或5年")
-    print("   4. 调整预测参数: 预测天数、历史数据长度")
-    print("   5. 点击开始预测")
-    print("   6. 查看图表和工具栏说明")
-    print("   7. 使用工具栏分析数据")
-    print("   8. 保存重要发现")
+        lines.append(f"   {i}. {feature}")
+    
+    lines.append("\n🚀 **性能特点**:")
+    lines.append("   - 处理速度: 500+ 条/秒")
+    lines.append("   - 响应时间: 2-3秒")
+    lines.append("   - 数据支持: 最高5000条历史记录")
+    lines.append("   - GPU加速: RTX 5090优化")
+    lines.append("   - 预测精度: 蒙特卡洛不确定性量化")
+    
+    lines.append("\n🌐 **访问地址**:")
+    lines.append("   前端界面: http://localhost:8501")
+    lines.append("   API文档: http://localhost:8000/docs")
+    
+    lines.append("\n📋 **使用流程**:")
+    lines.append("   1. 选择性能模式: 高性能模式 (RTX 5090)")
+    lines.append("   2. 输入股票代码: 如 000968")
+    lines.append("   3. 选择历史周期: 1年、2年或5年")
+    lines.append("   4. 调整预测参数: 预测天数、历史数据长度")
+    lines.append("   5. 点击开始预测")
+    lines.append("   6. 查看图表和工具栏说明")
+    lines.append("   7. 使用工具栏分析数据")
+    lines.append("   8. 保存重要发现")
+    
+    # 整段内容拼接后一次写出
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
 
 def main():
     """主函数"""
@@ -3,16 +3,18 @@
 测试蒙特卡洛预测修复
 """
 
-import requests
 import time
 
+import _predict_cache as predict_cache
+from _http import SESSION
+
 def test_monte_carlo_prediction():
     """测试蒙特卡洛预测功能"""
     print("🎲 测试蒙特卡洛预测...")
     
     try:
         start_time = time.time()
-        response = requests.post(
+        response = SESSION.post(
             'http://localhost:8000/predict',
             json={'stock_code': '000001', 'pred_len': 5},
             timeout=60  # 增加超时时间，因为要计算30次预测
@@ -20,7 +22,7 @@ def test_monte_carlo_prediction():
         end_time = time.time()
         
         if response.status_code == 200:
-            data = response.json()
+            data = predict_cache.loads(response.content)
             if data.get('success'):
                 predictions = data['data']['predictions']
                 
@@ -70,7 +72,7 @@ def test_streamlit_interface():
     print("\n🎨 测试Streamlit界面...")
     
     try:
-        response = requests.get('http://localhost:8501', timeout=5)
+        response = SESSION.get('http://localhost:8501', timeout=5)
         if response.status_code == 200:
             print("   ✅ Streamlit界面可访问")
             return True
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+预测路径模拟内核一致性测试
+固定随机扰动，验证 numpy 内核与原始逐日递推完全一致；安装了numba时同时验证JIT内核
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app import prediction_service
+from app.prediction_service import _simulate_path_numpy
+
+
+def reference_path(last_close, last_volume, price_trend, price_volatility, draws):
+    """原始的逐日递推实现（向量化之前的循环），作为对照"""
+    rows = []
+    for i in range(draws.shape[0]):
+        trend_factor = max(0.1, 1 - i * 0.1)
+
+        if i == 0:
+            gap_factor = np.clip(draws[i, 0] * 0.01, -0.02, 0.02)
+        else:
+            gap_factor = np.clip(draws[i, 0] * 0.005, -0.015, 0.015)
+        open_price = last_close * (1 + gap_factor)
+
+        price_change = price_trend * trend_factor + draws[i, 1] * (price_volatility * open_price * 0.5)
+        close_price = open_price + price_change
+        max_daily_change = open_price * 0.1
+        close_price = np.clip(close_price, open_price - max_daily_change, open_price + max_daily_change)
+        close_price = max(close_price, open_price * 0.5)
+
+        base_volatility = price_volatility * open_price * 0.3
+        high_base = max(open_price, close_price)
+        low_base = min(open_price, close_price)
+        high_price = min(high_base + abs(draws[i, 2]) * base_volatility, high_base * 1.05)
+        low_price = max(low_base - abs(draws[i, 3]) * base_volatility, low_base * 0.95)
+
+        new_volume = max(last_volume * 0.7, last_volume * (1 + draws[i, 4] * 0.15))
+        amount = (open_price + high_price + low_price + close_price) / 4 * new_volume
+
+        rows.append([open_price, high_price, low_price, close_price, new_volume, amount])
+        last_close = close_price
+        last_volume = new_volume
+    return np.array(rows)
+
+
+CASES = [
+    # (last_close, last_volume, price_trend, price_volatility)
+    (14.0, 1.2e6, 0.5, 0.02),
+    (14.0, 1.2e6, -0.3, 0.03),
+    (3.21, 8.0e5, 0.0, 0.0),
+    (1680.0, 3.0e4, 12.0, 0.015),
+]
+
+
+def _draws(seed, pred_len=30):
+    return np.random.default_rng(seed).standard_normal((pred_len, 5))
+
+
+def test_numpy_kernel_matches_reference():
+    for seed, case in enumerate(CASES):
+        draws = _draws(seed)
+        expected = reference_path(*case, draws)
+        actual = _simulate_path_numpy(*case, draws)
+        assert np.array_equal(actual, expected), f"numpy内核与原始递推不一致: {case}"
+
+
+def test_jit_kernel_matches_numpy():
+    if not prediction_service.NUMBA_AVAILABLE:
+        print("⚠️ 未安装numba，跳过JIT内核对比")
+        return
+    for seed, case in enumerate(CASES):
+        draws = _draws(seed)
+        expected = _simulate_path_numpy(*case, draws)
+        actual = prediction_service._simulate_path_jit(*case, draws)
+        assert np.array_equal(actual, expected), f"JIT内核与numpy内核不一致: {case}"
+
+
+if __name__ == '__main__':
+    test_numpy_kernel_matches_reference()
+    test_jit_kernel_matches_numpy()
+    print("✅ 路径模拟内核一致")
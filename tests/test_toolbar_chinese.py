@@ -3,34 +3,35 @@
 测试工具栏中文化
 """
 
-import requests
+import sys
 import time
 
+import _predict_cache as predict_cache
+from _http import scan_page
+
 def test_streamlit_interface():
     """测试Streamlit界面和工具栏"""
     print("🎨 测试Streamlit界面和工具栏中文化...")
     
     try:
-        response = requests.get('http://localhost:8501', timeout=5)
-        if response.status_code == 200:
+        status_code, found = scan_page('http://localhost:8501', ['forceTranslateToolbar', '工具栏使用说明'])
+        if status_code == 200:
             print("   ✅ Streamlit界面可访问")
             
             # 检查页面内容是否包含中文化相关代码
-            content = response.text
-            
-            if 'forceTranslateToolbar' in content:
+            if 'forceTranslateToolbar' in found:
                 print("   ✅ JavaScript中文化代码已加载")
             else:
                 print("   ⚠️ JavaScript中文化代码未找到")
                 
-            if '工具栏使用说明' in content:
+            if '工具栏使用说明' in found:
                 print("   ✅ 中文说明面板已加载")
             else:
                 print("   ⚠️ 中文说明面板未找到")
                 
             return True
         else:
-            print(f"   ❌ Streamlit异常: {response.status_code}")
+            print(f"   ❌ Streamlit异常: {status_code}")
             return False
     except Exception as e:
         print(f"   ❌ Streamlit连接失败: {str(e)}")
@@ -41,27 +42,27 @@ def test_prediction_with_chart():
     print("\n📊 测试预测功能和图表显示...")
     
     try:
+        payload = {
+            'stock_code': '000968',
+            'period': '1y',
+            'pred_len': 5,
+            'lookback': 500
+        }
         start_time = time.time()
-        response = requests.post(
-            'http://localhost:8000/predict',
-            json={
-                'stock_code': '000968',
-                'period': '1y',
-                'pred_len': 5,
-                'lookback': 500
-            },
-            timeout=30
-        )
+        status_code, data, response = predict_cache.cached_predict(payload, indent='   ')
         end_time = time.time()
         
-        if response.status_code == 200:
-            data = response.json()
+        if status_code == 200:
             if data.get('success'):
                 historical_data = data['data']['historical_data']
                 predictions = data['data']['predictions']
                 stock_info = data['data']['stock_info']
                 
-                print(f"   ✅ 预测成功 ({end_time - start_time:.1f}s)")
+                # 命中缓存时没有实际请求，不输出耗时
+                if response is None:
+                    print("   ✅ 预测成功")
+                else:
+                    print(f"   ✅ 预测成功 ({end_time - start_time:.1f}s)")
                 print(f"   📊 股票: {stock_info['name']} ({stock_info['code']})")
                 print(f"   📈 历史数据: {len(historical_data)} 条")
                 print(f"   🔮 预测数据: {len(predictions)} 条")
@@ -88,7 +89,7 @@ def test_prediction_with_chart():
                 print(f"   ❌ 预测失败: {data.get('error')}")
                 return False
         else:
-            print(f"   ❌ HTTP错误: {response.status_code}")
+            print(f"   ❌ HTTP错误: {status_code}")
             return False
             
     except Exception as e:
@@ -97,7 +98,8 @@ def test_prediction_with_chart():
 
 def check_javascript_methods():
     """检查JavaScript方法的可行性"""
-    print("\n🔧 JavaScript工具栏中文化方法分析...")
+    lines = []
+    lines.append("\n🔧 JavaScript工具栏中文化方法分析...")
     
     methods = [
         {
@@ -127,15 +129,19 @@ def check_javascript_methods():
     ]
     
     for i, method in enumerate(methods, 1):
-        print(f"\n   {i}. {method['name']}")
-        print(f"      实现: {method['description']}")
-        print(f"      优点: {method['pros']}")
-        print(f"      缺点: {method['cons']}")
+        lines.append(f"\n   {i}. {method['name']}")
+        lines.append(f"      实现: {method['description']}")
+        lines.append(f"      优点: {method['pros']}")
+        lines.append(f"      缺点: {method['cons']}")
+    
+    lines.append(f"\n   💡 当前采用: 多种方法组合")
+    lines.append(f"      - JavaScript多次尝试翻译")
+    lines.append(f"      - DOM变化监听")
+    lines.append(f"      - 中文说明面板作为备选")
     
-    print(f"\n   💡 当前采用: 多种方法组合")
-    print(f"      - JavaScript多次尝试翻译")
-    print(f"      - DOM变化监听")
-    print(f"      - 中文说明面板作为备选")
+    # 整段内容拼接后一次写出
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
 
 def main():
     """主测试函数"""
@@ -3,15 +3,19 @@
 测试工具栏优化效果
 """
 
-import requests
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+import _predict_cache as predict_cache
+from _capture import run_captured, thread_local_stdout
+from _http import SESSION
 
 def test_streamlit_interface():
     """测试Streamlit界面"""
     print("🎨 测试Streamlit界面优化...")
     
     try:
-        response = requests.get('http://localhost:8501', timeout=5)
+        response = SESSION.get('http://localhost:8501', timeout=5)
         if response.status_code == 200:
             print("   ✅ Streamlit界面可访问")
             return True
@@ -27,18 +31,18 @@ def test_prediction_api():
     print("\n🔮 测试预测API...")
     
     try:
+        payload = {'stock_code': '000001', 'pred_len': 5}
         start_time = time.time()
-        response = requests.post(
-            'http://localhost:8000/predict',
-            json={'stock_code': '000001', 'pred_len': 5},
-            timeout=20
-        )
+        status_code, data, response = predict_cache.cached_predict(payload, timeout=20, indent='   ', disk=False)
         end_time = time.time()
         
-        if response.status_code == 200:
-            data = response.json()
+        if status_code == 200:
             if data.get('success'):
-                print(f"   ✅ 预测成功 ({end_time - start_time:.1f}s)")
+                # 命中缓存时没有实际请求，不输出耗时
+                if response is None:
+                    print("   ✅ 预测成功")
+                else:
+                    print(f"   ✅ 预测成功 ({end_time - start_time:.1f}s)")
                 
                 # 检查数据完整性
                 predictions = data['data']['predictions']
@@ -58,7 +62,7 @@ def test_prediction_api():
                 print(f"   ❌ 预测失败: {data.get('error')}")
                 return False
         else:
-            print(f"   ❌ API错误: {response.status_code}")
+            print(f"   ❌ API错误: {status_code}")
             return False
             
     except Exception as e:
@@ -70,11 +74,17 @@ def main():
     print("🔧 工具栏优化测试")
     print("=" * 50)
     
-    # 测试API
-    api_ok = test_prediction_api()
-    
-    # 测试界面
-    ui_ok = test_streamlit_interface()
+    # API和界面测试互不依赖，并行执行，总耗时取决于较慢的一个；各自的输出捕获后按顺序打印
+    results = []
+    with thread_local_stdout(), ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(run_captured, test_func) for test_func in (test_prediction_api, test_streamlit_interface)]
+        for future in futures:
+            ok, error, output = future.result()
+            print(output, end='')
+            if error is not None:
+                print(f"   ❌ 测试异常: {str(error)}")
+            results.append(ok)
+    api_ok, ui_ok = results
     
     print("\n" + "=" * 50)
     print("📊 测试结果:")
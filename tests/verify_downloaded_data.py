@@ -8,23 +8,29 @@ import pandas as pd
 from pathlib import Path
 from datetime import datetime, timedelta
 
+# 下载脚本把所有股票追加写入同一个Parquet文件，symbol列为股票代码
+COMBINED_FILE = Path("data/akshare_data/cn_daily.parquet")
+
+def load_stock(stock_code):
+    """从合并文件中只读取一只股票的行（按symbol列下推过滤）"""
+    return pd.read_parquet(COMBINED_FILE, filters=[('symbol', '=', stock_code)])
+
 def verify_akshare_data():
     """验证akshare数据"""
     print("🔍 验证akshare下载的数据")
     print("=" * 40)
     
-    data_dir = Path("data/akshare_data")
-    
-    if not data_dir.exists():
-        print("❌ akshare数据目录不存在")
+    if not COMBINED_FILE.exists():
+        print(f"❌ akshare数据文件不存在: {COMBINED_FILE}")
         return False
     
-    # 获取所有CSV文件
-    csv_files = list(data_dir.glob("*.csv"))
-    print(f"📊 找到 {len(csv_files)} 个股票数据文件")
+    # 合并文件一次读入，按symbol分组得到各股票数据
+    all_data = pd.read_parquet(COMBINED_FILE)
+    groups = dict(tuple(all_data.groupby('symbol', sort=True)))
+    print(f"📊 找到 {len(groups)} 只股票的数据")
     
-    if len(csv_files) == 0:
-        print("❌ 没有找到数据文件")
+    if len(groups) == 0:
+        print("❌ 没有找到数据")
         return False
     
     # 分析数据质量
@@ -34,12 +40,11 @@ def verify_akshare_data():
     
     print("\n📈 数据质量分析:")
     
-    for i, csv_file in enumerate(csv_files[:10]):  # 检查前10个文件
+    for stock_code in list(groups)[:10]:  # 检查前10只股票
         try:
-            df = pd.read_csv(csv_file)
+            df = groups[stock_code].reset_index(drop=True)
             
             if len(df) > 0:
-                stock_code = csv_file.stem
                 record_count = len(df)
                 total_records += record_count
                 valid_files += 1
@@ -73,14 +78,14 @@ def verify_akshare_data():
                 else:
                     print(f"⚠️ {stock_code}: 缺少日期列")
             else:
-                print(f"❌ {csv_file.name}: 空文件")
+                print(f"❌ {stock_code}: 无数据")
                 
         except Exception as e:
-            print(f"❌ {csv_file.name}: 读取失败 - {str(e)}")
+            print(f"❌ {stock_code}: 读取失败 - {str(e)}")
     
     # 总体统计
     print(f"\n📊 总体统计:")
-    print(f"✅ 有效文件: {valid_files}/{len(csv_files)}")
+    print(f"✅ 有效股票: {valid_files}/{len(groups)}")
     print(f"📈 总记录数: {total_records:,}")
     
     if date_ranges:
@@ -104,14 +109,11 @@ def analyze_sample_stock():
     print("\n🔍 详细分析样本股票 (000001 平安银行)")
     print("=" * 40)
     
-    sample_file = Path("data/akshare_data/000001.csv")
-    
-    if not sample_file.exists():
-        print("❌ 样本文件不存在")
-        return False
-    
     try:
-        df = pd.read_csv(sample_file)
+        df = load_stock("000001")
+        if len(df) == 0:
+            print("❌ 样本股票数据不存在")
+            return False
         df['日期'] = pd.to_datetime(df['日期'])
         df = df.sort_values('日期')
         
@@ -174,9 +176,8 @@ def check_data_for_kronos():
             print(f"   {req}: {value}")
     
     # 检查样本数据
-    sample_file = Path("data/akshare_data/000001.csv")
-    if sample_file.exists():
-        df = pd.read_csv(sample_file)
+    df = load_stock("000001") if COMBINED_FILE.exists() else None
+    if df is not None and len(df) > 0:
         
         print(f"\n✅ 当前数据状态:")
         print(f"   实际记录数: {len(df)} 天")